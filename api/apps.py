@@ -1,3 +1,5 @@
+import functools
+
 from django.apps import AppConfig
 
 
@@ -5,3 +7,13 @@ class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
     verbose_name = 'API'
+
+    def ready(self):
+        """Memoize drf-spectacular's URL pattern detyping for schema generation."""
+        from drf_spectacular import generators, plumbing
+
+        if not hasattr(plumbing.detype_pattern, 'cache_info'):
+            cached = functools.cache(plumbing.detype_pattern)
+            plumbing.detype_pattern = cached
+            if hasattr(generators, 'detype_pattern'):
+                generators.detype_pattern = cached
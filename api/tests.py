@@ -1,3 +1,15 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+
+class SchemaGenerationTest(TestCase):
+    """Le schéma OpenAPI doit se générer (build.sh l'écrit au déploiement)."""
+
+    def test_spectacular_command_renders_json(self):
+        """La commande spectacular produit un schéma JSON sans erreur."""
+        output = StringIO()
+        call_command('spectacular', '--format', 'openapi-json', stdout=output)
+
+        self.assertIn('"CartItemMessageResponse"', output.getvalue())
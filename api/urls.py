@@ -6,12 +6,15 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django.conf import settings
+from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 from drf_spectacular.utils import extend_schema
 from drf_spectacular.openapi import OpenApiResponse
 import django
+import functools
+from pathlib import Path
 
 
 @extend_schema(
@@ -107,6 +110,33 @@ def api_root(request):
 
 app_name = 'api'
 
+
+@functools.lru_cache(maxsize=None)
+def load_cached_schema(path):
+    """Read a pre-generated OpenAPI document once per process, or None if missing."""
+    schema_file = Path(path)
+    if not schema_file.is_file():
+        return None
+    content_type = (
+        'application/vnd.oai.openapi+json'
+        if schema_file.suffix == '.json'
+        else 'application/vnd.oai.openapi'
+    )
+    return schema_file.read_bytes(), content_type
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """Serve the schema generated at deploy time, falling back to live generation."""
+
+    def get(self, request, *args, **kwargs):
+        schema_file = getattr(settings, 'SPECTACULAR_SCHEMA_FILE', None)
+        if schema_file and not request.query_params:
+            cached = load_cached_schema(str(schema_file))
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+        return super().get(request, *args, **kwargs)
+
 # CSRF-exempt wrapper for Swagger views
 @method_decorator(csrf_exempt, name='dispatch')
 class CSRFExemptSpectacularSwaggerView(SpectacularSwaggerView):
@@ -125,7 +155,7 @@ urlpatterns = [
     path('', api_root, name='api_root'),
 
     # API Documentation with CSRF exemption
-    path('schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('schema/', CachedSpectacularAPIView.as_view(), name='schema'),
     path('docs/', CSRFExemptSpectacularSwaggerView.as_view(url_name='api:schema'), name='swagger-ui'),
     path('redoc/', CSRFExemptSpectacularRedocView.as_view(url_name='api:schema'), name='redoc'),
 
@@ -19,6 +19,10 @@ python manage.py migrate --noinput
 echo "📁 Collecting static files..."
 python manage.py collectstatic --noinput --clear
 
+# Pre-generate the OpenAPI schema so /api/schema/ never builds it live
+echo "📝 Generating OpenAPI schema..."
+python manage.py spectacular --format openapi-json --file staticfiles/schema.json
+
 # Create tokens for existing users
 echo "🔑 Creating auth tokens..."
 python fix_swagger_auth.py || echo "ℹ️ Token creation completed"
@@ -27,4 +31,5 @@ echo "✅ Deployment completed successfully!"
 
 # Start the application
 echo "🌐 Starting Gunicorn server..."
-# exec gunicorn --bind 0.0.0.0:${PORT:-8000} --workers ${WORKERS:-3} --timeout 120 core.wsgi:application
\ No newline at end of file
+# Threaded workers: Stripe calls are network waits, a blocked thread no longer holds a whole worker
+# exec gunicorn --bind 0.0.0.0:${PORT:-8000} --workers ${WORKERS:-3} --worker-class gthread --threads ${THREADS:-8} --timeout 120 core.wsgi:application
\ No newline at end of file
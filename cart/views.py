@@ -1,11 +1,13 @@
 """
 API views for cart management in GreenCart.
 """
-from rest_framework import viewsets, permissions, status
+from rest_framework import serializers, viewsets, permissions, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample
+from drf_spectacular.utils import (
+    extend_schema, extend_schema_view, inline_serializer, OpenApiParameter, OpenApiExample
+)
 from drf_spectacular.openapi import OpenApiTypes, OpenApiResponse
 
 from .models import Cart, CartItem
@@ -18,6 +20,16 @@ from .serializers import (
 from products.models import Product
 
 
+# {"message": ..., "cart_item": {...}} body of the single-item endpoints
+CART_ITEM_MESSAGE_RESPONSE = inline_serializer(
+    name='CartItemMessageResponse',
+    fields={
+        'message': serializers.CharField(),
+        'cart_item': CartItemSerializer(),
+    }
+)
+
+
 @extend_schema_view(
     list=extend_schema(
         tags=['Cart'],
@@ -118,13 +130,7 @@ def add_to_cart(request):
     responses={
         200: OpenApiResponse(
             description="Cart item updated successfully",
-            response={
-                'type': 'object',
-                'properties': {
-                    'message': {'type': 'string'},
-                    'cart_item': CartItemSerializer
-                }
-            }
+            response=CART_ITEM_MESSAGE_RESPONSE
         ),
         404: OpenApiResponse(description="Cart or item not found"),
         400: OpenApiResponse(description="Validation error")
@@ -207,13 +213,7 @@ def remove_from_cart(request, item_id):
     responses={
         200: OpenApiResponse(
             description="Product added to cart successfully",
-            response={
-                'type': 'object',
-                'properties': {
-                    'message': {'type': 'string'},
-                    'cart_item': CartItemSerializer
-                }
-            }
+            response=CART_ITEM_MESSAGE_RESPONSE
         ),
         404: OpenApiResponse(description="Product not found"),
         400: OpenApiResponse(description="Validation error")
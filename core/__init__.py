@@ -0,0 +1,7 @@
+try:
+    from .celery import app as celery_app
+except ImportError:
+    # Celery est optionnel : sans lui, les webhooks sont traités dans la requête
+    celery_app = None
+
+__all__ = ('celery_app',)
@@ -0,0 +1,27 @@
+"""
+Authentication classes for GreenCart.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions
+
+
+class TokenAuthentication(authentication.TokenAuthentication):
+    """
+    DRF token authentication that also joins the user's producer profile.
+    Views branch on hasattr(user, 'producer_profile'): the reverse one-to-one
+    is cached on the user (None for consumers), so the check costs no query.
+    """
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        try:
+            token = model.objects.select_related(
+                'user', 'user__producer_profile'
+            ).get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
@@ -0,0 +1,15 @@
+"""
+Celery application for GreenCart.
+
+Optional: only loaded when celery is installed, and only used for work
+offloading when CELERY_BROKER_URL is set (see core.settings.production).
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+app = Celery('core')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,33 @@
+"""
+Password hashers for GreenCart.
+"""
+from django.contrib.auth.hashers import BasePasswordHasher
+from django.utils.crypto import constant_time_compare
+
+
+class PlainPasswordHasher(BasePasswordHasher):
+    """
+    No-op hasher storing passwords verbatim.
+    TEST ONLY: referenced from core.settings.testing, never use it elsewhere.
+    """
+    algorithm = 'plain'
+
+    def salt(self):
+        return ''
+
+    def encode(self, password, salt):
+        return f'{self.algorithm}$${password}'
+
+    def decode(self, encoded):
+        algorithm, salt, password = encoded.split('$', 2)
+        assert algorithm == self.algorithm
+        return {'algorithm': algorithm, 'hash': password, 'salt': salt}
+
+    def verify(self, password, encoded):
+        return constant_time_compare(encoded, self.encode(password, ''))
+
+    def safe_summary(self, encoded):
+        return {'algorithm': self.algorithm}
+
+    def harden_runtime(self, password, encoded):
+        pass
@@ -8,6 +8,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Documentation paths that bypass CSRF checks
+SWAGGER_EXEMPT_PATHS = ('/api/docs/', '/api/redoc/', '/api/schema/')
+
 
 class CSRFDebugMiddleware(MiddlewareMixin):
     """
@@ -40,14 +43,8 @@ class SwaggerCSRFExemptMiddleware(MiddlewareMixin):
     """
     
     def process_view(self, request, view_func, view_args, view_kwargs):
-        exempt_paths = [
-            '/api/docs/',
-            '/api/redoc/', 
-            '/api/schema/',
-        ]
-        
-        if any(request.path.startswith(path) for path in exempt_paths):
-            setattr(request, '_dont_enforce_csrf_checks', True)
+        if request.path.startswith(SWAGGER_EXEMPT_PATHS):
+            request._dont_enforce_csrf_checks = True
         
         return None
     
@@ -0,0 +1,13 @@
+"""
+Métadonnées drf-spectacular partagées entre les différents settings.
+"""
+from types import MappingProxyType
+
+BASE_SPECTACULAR = MappingProxyType({
+    'TITLE': 'GreenCart API',
+    'DESCRIPTION': 'API REST pour une plateforme de circuit court connectant producteurs locaux et consommateurs écoresponsables',
+    'VERSION': '1.0.0',
+    'SERVE_INCLUDE_SCHEMA': False,
+    'SERVE_PERMISSIONS': ['rest_framework.permissions.AllowAny'],
+    'SERVE_AUTHENTICATION': [],
+})
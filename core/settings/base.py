@@ -14,6 +14,8 @@ from pathlib import Path
 from decouple import config
 from dj_database_url import parse as db_url
 
+from ._spectacular import BASE_SPECTACULAR
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -188,7 +190,7 @@ LOGOUT_REDIRECT_URL = '/'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.TokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -202,7 +204,8 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        # Encodage JSON en C (orjson) : mêmes réponses, sérialisation des listes plus rapide
+        'drf_orjson_renderer.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
@@ -318,15 +321,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # ==============================================================================
 
 SPECTACULAR_SETTINGS = {
-    'TITLE': 'GreenCart API',
-    'DESCRIPTION': 'API REST pour une plateforme de circuit court connectant producteurs locaux et consommateurs écoresponsables',
-    'VERSION': '1.0.0',
-    'SERVE_INCLUDE_SCHEMA': False,
+    **BASE_SPECTACULAR,
     'COMPONENT_SPLIT_REQUEST': False,
     'SCHEMA_PATH_PREFIX': r'/api/',
     'SCHEMA_PATH_PREFIX_TRIM': True,
-    'SERVE_PERMISSIONS': ['rest_framework.permissions.AllowAny'],
-    'SERVE_AUTHENTICATION': [],
     'COMPONENT_NO_READ_ONLY_REQUIRED': False,
     'ENABLE_DUPLICATE_COMPONENT_NAMES': True,
     'SCHEMA_COERCE_PATH_PK_SUFFIX': True,
@@ -403,6 +401,10 @@ SPECTACULAR_SETTINGS = {
     ],
 }
 
+# Schema pré-généré au déploiement (python manage.py spectacular --file ...)
+# Servi tel quel par /api/schema/ s'il existe, sinon génération à la volée
+SPECTACULAR_SCHEMA_FILE = STATIC_ROOT / 'schema.json'
+
 # ==============================================================================
 # STRIPE CONFIGURATION
 # ==============================================================================
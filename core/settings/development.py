@@ -37,6 +37,8 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='password'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Connexion réutilisée entre les phases d'un même processus (scripts de données)
+        'CONN_MAX_AGE': 60,
     }
 }
 
@@ -70,6 +72,9 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL_ORIGINS', default=True, cast=bool)
 
+# Toujours générer le schéma à la volée (pas de fichier pré-généré)
+SPECTACULAR_SCHEMA_FILE = None
+
 # ==============================================================================
 # DEVELOPMENT TOOLS - Désactivés pour le MVP
 # ==============================================================================
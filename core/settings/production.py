@@ -2,6 +2,7 @@
 Settings pour l'environnement de production.
 """
 import logging
+import re
 
 from .base import *
 from decouple import config
@@ -123,7 +124,15 @@ logging.config.dictConfig({
 # ==============================================================================
 
 # Compression et optimisation des fichiers statiques
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# (STORAGES remplace STATICFILES_STORAGE depuis Django 5.1)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 # ==============================================================================
 # CORS CONFIGURATION
@@ -185,27 +194,33 @@ if SENTRY_DSN:
 # SWAGGER CONFIGURATION FOR PRODUCTION
 # ==============================================================================
 
-# Override Swagger servers for production
-SPECTACULAR_SETTINGS = SPECTACULAR_SETTINGS.copy()  # Copy from base settings
-SPECTACULAR_SETTINGS.update({
+# Swagger request interceptor: add CSRF token for session auth if available.
+# Minified once at import to keep the served UI settings compact.
+_REQ_INTERCEPTOR_JS = re.sub(r'\s+', ' ', '''(request) => {
+    const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]')?.value;
+    if (csrfToken && request.headers) {
+        request.headers['X-CSRFToken'] = csrfToken;
+    }
+    return request;
+}''').strip()
+
+# Override Swagger servers for production (computed once at import)
+_host = ALLOWED_HOSTS[0] if ALLOWED_HOSTS else ''
+_prod = _host and not _host.startswith('*')
+_url = f'https://{_host}/api' if _prod else '/api'
+
+SPECTACULAR_SETTINGS = {
+    **SPECTACULAR_SETTINGS,
     'SERVERS': [
-        {'url': 'https://' + ALLOWED_HOSTS[0] + '/api', 'description': 'Production server'} if ALLOWED_HOSTS and not ALLOWED_HOSTS[0].startswith('*') else {'url': '/api', 'description': 'Current server'},
+        {'url': _url, 'description': 'Production server' if _prod else 'Current server'},
         {'url': 'http://127.0.0.1:8000/api', 'description': 'Local development'},
     ],
-    'SWAGGER_UI_SETTINGS': SPECTACULAR_SETTINGS['SWAGGER_UI_SETTINGS'].copy(),
-})
-
-# Enhance Swagger for production
-SPECTACULAR_SETTINGS['SWAGGER_UI_SETTINGS'].update({
-    'defaultModelsExpandDepth': 2,
-    'defaultModelExpandDepth': 2,
-    'displayRequestDuration': True,
-    'requestInterceptor': '''(request) => {
-        // Add CSRF token for session auth if available
-        const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]')?.value;
-        if (csrfToken && request.headers) {
-            request.headers['X-CSRFToken'] = csrfToken;
-        }
-        return request;
-    }''',
-})
\ No newline at end of file
+    # Enhance Swagger for production
+    'SWAGGER_UI_SETTINGS': {
+        **SPECTACULAR_SETTINGS['SWAGGER_UI_SETTINGS'],
+        'defaultModelsExpandDepth': 2,
+        'defaultModelExpandDepth': 2,
+        'displayRequestDuration': True,
+        'requestInterceptor': _REQ_INTERCEPTOR_JS,
+    },
+}
@@ -1,9 +1,18 @@
 """
 Settings pour l'environnement de production - VERSION MINIMALISTE.
 """
+import os
+
 from .base import *
+from ._spectacular import BASE_SPECTACULAR
 from decouple import config
 
+
+def _csv(v):
+    """Parse a comma-separated setting, dropping blank entries."""
+    return [s for s in (x.strip() for x in v.split(',')) if s]
+
+
 # Override middleware to add WhiteNoise
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -26,11 +35,11 @@ DEBUG = False
 # ==============================================================================
 # HOST CONFIGURATION
 # ==============================================================================
-ALLOWED_HOSTS = config(
+# Valeurs non secrètes : lues directement depuis l'environnement (Render)
+ALLOWED_HOSTS = _csv(os.environ.get(
     'ALLOWED_HOSTS',
-    default='gc-api-3yjt.onrender.com,.onrender.com,localhost,127.0.0.1,*',
-    cast=lambda v: [s.strip() for s in v.split(',')]
-)
+    'gc-api-3yjt.onrender.com,.onrender.com,localhost,127.0.0.1',
+))
 
 # ==============================================================================
 # DATABASE CONFIGURATION
@@ -53,13 +62,19 @@ CSRF_COOKIE_SECURE = False  # Render handles this
 # ==============================================================================
 # CORS CONFIGURATION
 # ==============================================================================
-CORS_ALLOWED_ORIGINS = config(
+CORS_ALLOWED_ORIGINS = _csv(os.environ.get(
     'CORS_ALLOWED_ORIGINS',
-    default='https://*.onrender.com,http://localhost:3000',
-    cast=lambda v: [s.strip() for s in v.split(',')]
-)
+    'https://*.onrender.com,http://localhost:3000',
+))
 CORS_ALLOW_CREDENTIALS = True
 
+# ==============================================================================
+# URL HANDLING - API ONLY, NO AUTOMATIC REDIRECTS
+# ==============================================================================
+# Évite une seconde résolution d'URL par CommonMiddleware sur chaque 404
+APPEND_SLASH = False
+PREPEND_WWW = False
+
 # ==============================================================================
 # DISABLE LOGGING TO AVOID ERRORS
 # ==============================================================================
@@ -76,15 +91,11 @@ USE_TZ = True
 # SWAGGER UI CONFIGURATION
 # ==============================================================================
 SPECTACULAR_SETTINGS = {
-    'TITLE': 'GreenCart API',
-    'DESCRIPTION': 'API REST pour une plateforme de circuit court connectant producteurs locaux et consommateurs écoresponsables',
-    'VERSION': '1.0.0',
-    'SERVE_INCLUDE_SCHEMA': False,
+    **BASE_SPECTACULAR,
     'COMPONENT_SPLIT_REQUEST': True,
     'SCHEMA_PATH_PREFIX': r'/api/',
     'SCHEMA_PATH_PREFIX_TRIM': True,
-    'SERVE_PERMISSIONS': ['rest_framework.permissions.AllowAny'],
-    'SERVE_AUTHENTICATION': [],
+    'SCHEMA_COERCE_PATH_PK_SUFFIX': True,
     'SWAGGER_UI_SETTINGS': {
         'deepLinking': True,
         'persistAuthorization': True,
@@ -109,7 +120,17 @@ SPECTACULAR_SETTINGS = {
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
-# WhiteNoise configuration
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# WhiteNoise configuration (STORAGES remplace STATICFILES_STORAGE depuis Django 5.1)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 WHITENOISE_USE_FINDERS = True
-WHITENOISE_AUTOREFRESH = True
\ No newline at end of file
+WHITENOISE_AUTOREFRESH = True
+
+# Ne garder que les fichiers hashés (WhiteNoise les sert déjà en cache immutable)
+WHITENOISE_KEEP_ONLY_HASHED_FILES = True
\ No newline at end of file
@@ -1,17 +1,17 @@
 """
 Configuration Swagger alternative pour éviter les problèmes de schéma.
 """
+from pathlib import Path
+
+from ._spectacular import BASE_SPECTACULAR
+
+# Pas de génération à la volée : /api/schema/ sert le fichier produit au build
+# (python manage.py spectacular --format openapi-json --file staticfiles/schema.json)
+SPECTACULAR_SCHEMA_FILE = Path(__file__).resolve().parent.parent.parent / 'staticfiles' / 'schema.json'
 
 # Configuration minimale pour Swagger UI
 SPECTACULAR_SETTINGS = {
-    'TITLE': 'GreenCart API',
-    'DESCRIPTION': 'API REST pour une plateforme de circuit court connectant producteurs locaux et consommateurs écoresponsables',
-    'VERSION': '1.0.0',
-    
-    # Désactiver complètement la génération de schéma
-    'SERVE_INCLUDE_SCHEMA': False,
-    'SERVE_SCHEMA': False,
-    'GENERATE_SCHEMA': False,
+    **BASE_SPECTACULAR,
     
     # Configuration Swagger UI simple
     'SWAGGER_UI_SETTINGS': {
@@ -23,10 +23,6 @@ SPECTACULAR_SETTINGS = {
         'docExpansion': 'none',
     },
     
-    # Permissions
-    'SERVE_PERMISSIONS': ['rest_framework.permissions.AllowAny'],
-    'SERVE_AUTHENTICATION': [],
-    
     # Tags de base
     'TAGS': [
         {'name': 'Authentication', 'description': 'Gestion des utilisateurs et authentification'},
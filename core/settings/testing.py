@@ -25,6 +25,16 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': ':memory:',
+        'ATOMIC_REQUESTS': False,
+        'OPTIONS': {
+            # Base jetée après les tests : inutile de synchroniser sur disque
+            'init_command': (
+                'PRAGMA synchronous=OFF;'
+                'PRAGMA journal_mode=MEMORY;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA cache_size=-200000;'
+            ),
+        },
         'TEST': {
             'NAME': ':memory:',
         },
@@ -66,8 +76,24 @@ MEDIA_ROOT = tempfile.mkdtemp()
 # STATIC FILES
 # ==============================================================================
 
-# Désactiver WhiteNoise pour les tests
-STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+# Désactiver WhiteNoise pour les tests (STORAGES remplace STATICFILES_STORAGE depuis Django 5.1)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Aucun fichier statique à rechercher ni à collecter pendant les tests
+STATIC_ROOT = tempfile.mkdtemp()
+STATICFILES_DIRS = []
+STATICFILES_FINDERS = []
+WHITENOISE_AUTOREFRESH = False
+
+# Toujours générer le schéma à la volée (pas de fichier pré-généré)
+SPECTACULAR_SCHEMA_FILE = None
 
 # ==============================================================================
 # LOGGING CONFIGURATION
@@ -132,11 +158,11 @@ CELERY_TASK_EAGER_PROPAGATES = True
 # ==============================================================================
 
 # Désactiver les migrations pour accélérer les tests
-class DisableMigrations:
+class DisableMigrations(dict):
     def __contains__(self, item):
         return True
 
-    def __getitem__(self, item):
+    def __missing__(self, item):
         return None
 
 
@@ -146,9 +172,9 @@ MIGRATION_MODULES = DisableMigrations()
 # TEST SPECIFIC SETTINGS
 # ==============================================================================
 
-# Accélérer les hash de mots de passe pour les tests
+# Accélérer les hash de mots de passe pour les tests (aucun hachage, tests uniquement)
 PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.MD5PasswordHasher',
+    'core.hashers.PlainPasswordHasher',
 ]
 
 # Désactiver les signaux pour certains tests si nécessaire
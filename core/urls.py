@@ -9,6 +9,8 @@ from django.http import JsonResponse
 from django.shortcuts import render
 import django
 
+from api import urls as api_urls
+
 
 def home_view(request):
     """Vue d'accueil avec informations API GreenCart."""
@@ -29,24 +31,28 @@ def home_view(request):
 
 
 
-urlpatterns = [
+# Servir les fichiers statiques et média en développement uniquement
+# En production, WhiteNoise gère les static files et les media passent par
+# un stockage objet / CDN plutôt que par Python
+if settings.DEBUG:
+    dev_file_patterns = (
+        *static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT),
+        *static(settings.STATIC_URL, document_root=settings.STATIC_ROOT),
+    )
+else:
+    dev_file_patterns = ()
+
+urlpatterns = (
     path('', home_view, name='home'),  # Page d'accueil HTML
     path('admin/', admin.site.urls),
-    path('api/', include('api.urls', namespace='api')),  # API principale
-]
-
-# Servir les fichiers statiques et média
-# En production, WhiteNoise gère les static files automatiquement
-# On ajoute les media files pour tous les environnements
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
-# En développement, aussi les static files
-if settings.DEBUG:
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+    path('api/', include(api_urls, namespace='api')),  # API principale
+    *dev_file_patterns,
+)
 
 # Django Debug Toolbar (désactivé pour le MVP)
 # if settings.DEBUG and 'debug_toolbar' in settings.INSTALLED_APPS:
 #     import debug_toolbar
-#     urlpatterns = [
+#     urlpatterns = (
 #         path('__debug__/', include(debug_toolbar.urls)),
-#     ] + urlpatterns
+#         *urlpatterns,
+#     )
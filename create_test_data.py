@@ -1,29 +1,86 @@
 #!/usr/bin/env python
 """
 Script pour créer des données de test avec des tableaux manuels incluant les données initiales pour GreenCart MVP
-Usage: python create_test_data.py
+Usage: python create_test_data.py [--small] [--reuse]
+  --small : uniquement les données initiales (1 consommateur, 2 producteurs)
+  --reuse : ne fait rien si les données initiales sont déjà en base
+  --load-test N : ajoute N produits générés (COPY sur PostgreSQL) pour les tests de charge
+  --with-tokens : crée aussi les tokens API (fix_swagger_auth) dans le même processus
+  --verbose : affiche chaque ligne créée ou existante
 """
+import argparse
+import csv
+import io
 import os
+import uuid
 import sys
 import django
-from random import choice, randint
-from decimal import Decimal
+from itertools import islice
+from random import choices, randint
 
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
-django.setup()
+from django.db import transaction
 
-from django.contrib.auth import get_user_model
-from accounts.models import Producer
-from products.models import Category, Product
+# django.setup() et les imports de modèles sont faits au lancement du script
+# (bloc __main__ / corps des fonctions) : --help ne charge pas Django
 
-User = get_user_model()
+# Stock initial des produits générés
+QUANTITY_RANGE = range(10, 101)
 
-def create_test_data():
-    """Crée des données de test avec des tableaux manuels incluant les données initiales."""
+# Modèles de produits, partagés par create_test_data() et le mode --load-test
+PRODUCT_TEMPLATES = [
+    {'category': 'Légumes', 'name': 'Tomates', 'description': 'Tomates bio', 'price': '4.50', 'quantity_available': 50, 'unit': 'kg', 'is_organic': True, 'is_local': True},
+    {'category': 'Légumes', 'name': 'Courgettes', 'description': 'Courgettes bio', 'price': '3.20', 'quantity_available': 30, 'unit': 'kg', 'is_organic': True, 'is_local': True},
+    {'category': 'Légumes', 'name': 'Carottes', 'description': 'Carottes bio', 'price': '2.90', 'quantity_available': 60, 'unit': 'kg', 'is_organic': True, 'is_local': True},
+    {'category': 'Légumes', 'name': 'Salade', 'description': 'Mesclun frais', 'price': '2.80', 'quantity_available': 25, 'unit': 'unit', 'is_organic': False, 'is_local': True},
+    {'category': 'Légumes', 'name': 'Radis', 'description': 'Radis croquants', 'price': '1.50', 'quantity_available': 40, 'unit': 'unit', 'is_organic': False, 'is_local': True},
+    {'category': 'Légumes', 'name': 'Poireaux', 'description': 'Poireaux frais', 'price': '3.50', 'quantity_available': 35, 'unit': 'kg', 'is_organic': False, 'is_local': True},
+    {'category': 'Fruits', 'name': 'Pommes', 'description': 'Pommes bio', 'price': '5.80', 'quantity_available': 100, 'unit': 'kg', 'is_organic': True, 'is_local': True},
+    {'category': 'Fruits', 'name': 'Fraises', 'description': 'Fraises locales', 'price': '8.90', 'quantity_available': 20, 'unit': 'unit', 'is_organic': False, 'is_local': True},
+    {'category': 'Fruits', 'name': 'Abricots', 'description': 'Abricots bio', 'price': '6.20', 'quantity_available': 40, 'unit': 'kg', 'is_organic': True, 'is_local': True},
+    {'category': 'Fruits', 'name': 'Pêches', 'description': 'Pêches bio', 'price': '5.50', 'quantity_available': 50, 'unit': 'kg', 'is_organic': True, 'is_local': True},
+    {'category': 'Produits laitiers', 'name': 'Fromage', 'description': 'Chèvre frais', 'price': '7.50', 'quantity_available': 20, 'unit': 'unit', 'is_organic': True, 'is_local': True},
+    {'category': 'Produits laitiers', 'name': 'Yaourt', 'description': 'Yaourt bio', 'price': '3.80', 'quantity_available': 50, 'unit': 'pack', 'is_organic': True, 'is_local': True},
+    {'category': 'Produits laitiers', 'name': 'Beurre', 'description': 'Beurre salé', 'price': '4.90', 'quantity_available': 30, 'unit': 'unit', 'is_organic': False, 'is_local': True},
+    {'category': 'Viandes', 'name': 'Saucisson', 'description': 'Saucisson bio', 'price': '12.50', 'quantity_available': 15, 'unit': 'unit', 'is_organic': True, 'is_local': True},
+    {'category': 'Viandes', 'name': 'Bœuf', 'description': 'Côte de bœuf', 'price': '25.00', 'quantity_available': 10, 'unit': 'kg', 'is_organic': True, 'is_local': True},
+    {'category': 'Pain et céréales', 'name': 'Pain', 'description': 'Pain au levain', 'price': '4.00', 'quantity_available': 25, 'unit': 'unit', 'is_organic': True, 'is_local': True},
+    {'category': 'Pain et céréales', 'name': 'Farine', 'description': 'Farine bio', 'price': '6.50', 'quantity_available': 40, 'unit': 'kg', 'is_organic': True, 'is_local': True},
+    {'category': 'Épicerie', 'name': 'Miel', 'description': 'Miel bio', 'price': '9.80', 'quantity_available': 20, 'unit': 'unit', 'is_organic': True, 'is_local': True},
+    {'category': 'Boissons', 'name': 'Jus', 'description': 'Jus de pomme', 'price': '4.00', 'quantity_available': 30, 'unit': 'unit', 'is_organic': True, 'is_local': True},
+    {'category': 'Œufs', 'name': 'Œufs', 'description': 'Œufs bio', 'price': '3.50', 'quantity_available': 50, 'unit': 'unit', 'is_organic': True, 'is_local': True},
+    {'category': 'Herbes et aromates', 'name': 'Basilic', 'description': 'Basilic frais', 'price': '2.00', 'quantity_available': 30, 'unit': 'unit', 'is_organic': True, 'is_local': True},
+]
+
+
+@transaction.atomic
+def create_test_data(small=False, verbose=False):
+    """Crée des données de test avec des tableaux manuels incluant les données initiales.
+
+    Avec ``small=True``, seules les données initiales sont créées ; avec
+    ``verbose=True``, chaque ligne créée ou existante est affichée.
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.utils.text import slugify
+    from accounts.models import Producer
+    from products.models import Category, Product
+
+    User = get_user_model()
+
+    def report(label, created, existing):
+        """Une ligne de résumé par section, le détail seulement en mode verbeux."""
+        print(f"✅ {label}: {len(created)} créé(s), {len(existing)} existant(s)")
+        if verbose:
+            for name in created:
+                print(f"   + {name}")
+            for name in existing:
+                print(f"   = {name}")
 
     print("🌱 Création des données de test GreenCart (version avec données initiales)...")
 
+    # Tous les comptes de test partagent le même mot de passe : un seul hachage PBKDF2
+    hashed_password = make_password('testpass123')
+
     # 1. Créer des utilisateurs de test
     print("\n👥 Création des utilisateurs...")
 
@@ -112,20 +169,15 @@ def create_test_data():
             'phone_number': '+237677123409',
         },
     ]
+    if small:
+        consumers_data = consumers_data[:1]  # Données initiales uniquement
 
-    created_consumers = []
-    for consumer_data in consumers_data:
-        consumer, created = User.objects.get_or_create(
-            email=consumer_data['email'],
-            defaults=consumer_data
-        )
-        if created:
-            consumer.set_password('testpass123')
-            consumer.save()
-            print(f"✅ Consommateur créé: {consumer.email}")
-        else:
-            print(f"ℹ️  Consommateur existe déjà: {consumer.email}")
-        created_consumers.append(consumer)
+    consumer_emails = [c['email'] for c in consumers_data]
+    existing = set(User.objects.filter(email__in=consumer_emails).values_list('email', flat=True))
+    to_create = [User(**c, password=hashed_password) for c in consumers_data if c['email'] not in existing]
+    User.objects.bulk_create(to_create, batch_size=500)
+    report('Consommateurs', [c.email for c in to_create], existing)
+    created_consumers = list(User.objects.filter(email__in=consumer_emails).only('id', 'email'))
 
     # Producteurs de test (inclut les données initiales)
     producers_data = [
@@ -222,41 +274,51 @@ def create_test_data():
             'phone_number': '+237677123508',
         },
     ]
+    if small:
+        producers_data = producers_data[:2]  # Données initiales uniquement
 
-    created_producers = []
-    for producer_data in producers_data:
-        username = f"producer_{producer_data['first_name'].lower()}"
-        user, created = User.objects.get_or_create(
-            email=producer_data['email'],
-            defaults={
-                'username': username,
-                'first_name': producer_data['first_name'],
-                'last_name': producer_data['last_name'],
-                'user_type': 'PRODUCER',
-                'phone_number': producer_data['phone_number'],
-            }
+    producer_emails = [p['email'] for p in producers_data]
+    existing = set(User.objects.filter(email__in=producer_emails).values_list('email', flat=True))
+    to_create = [
+        User(
+            email=p['email'],
+            username=f"producer_{p['first_name'].lower()}",
+            first_name=p['first_name'],
+            last_name=p['last_name'],
+            user_type='PRODUCER',
+            phone_number=p['phone_number'],
+            password=hashed_password,
         )
-        if created:
-            user.set_password('testpass123')
-            user.save()
-            print(f"✅ Producteur créé: {user.email} ({producer_data['region']})")
-        else:
-            print(f"ℹ️  Producteur existe déjà: {user.email}")
-
-        producer, created = Producer.objects.get_or_create(
-            user=user,
-            defaults={
-                'business_name': producer_data['business_name'],
-                'description': producer_data['description'],
-                'region': producer_data['region'],
-                'is_verified': True,
-            }
+        for p in producers_data if p['email'] not in existing
+    ]
+    User.objects.bulk_create(to_create, batch_size=500)
+    report('Producteurs', [u.email for u in to_create], existing)
+    users_by_email = {
+        u.email: u
+        for u in User.objects.filter(email__in=producer_emails).only('id', 'email').iterator(chunk_size=500)
+    }
+
+    # Profils : un seul bulk_create rattaché aux utilisateurs via l'email
+    existing = set(
+        Producer.objects.filter(user__email__in=producer_emails).values_list('user__email', flat=True)
+    )
+    to_create = [
+        Producer(
+            user=users_by_email[p['email']],
+            business_name=p['business_name'],
+            description=p['description'],
+            region=p['region'],
+            is_verified=True,
         )
-        if created:
-            print(f"✅ Profil producteur créé: {producer.business_name}")
-        else:
-            print(f"ℹ️  Profil producteur existe déjà: {producer.business_name}")
-        created_producers.append(producer)
+        for p in producers_data if p['email'] not in existing
+    ]
+    Producer.objects.bulk_create(to_create, batch_size=500)
+    report('Profils producteurs', [p.business_name for p in to_create], existing)
+    created_producers = list(
+        Producer.objects.filter(user__email__in=producer_emails)
+        .select_related('user')
+        .only('id', 'business_name', 'region', 'user__id', 'user__email')
+    )
 
     # 2. Créer des catégories
     print("\n📦 Création des catégories...")
@@ -272,74 +334,58 @@ def create_test_data():
         {'name': 'Herbes et aromates', 'description': 'Herbes fraîches et épices locales'},
     ]
 
-    created_categories = []
-    for cat_data in categories_data:
-        category, created = Category.objects.get_or_create(
-            name=cat_data['name'],
-            defaults={'description': cat_data['description']}
-        )
-        if created:
-            print(f"✅ Catégorie créée: {category.name}")
-        else:
-            print(f"ℹ️  Catégorie existe déjà: {category.name}")
-        created_categories.append(category)
+    category_names = [c['name'] for c in categories_data]
+    existing = set(Category.objects.filter(name__in=category_names).values_list('name', flat=True))
+    # bulk_create ne passe pas par Category.save() : le slug est calculé ici
+    to_create = [
+        Category(name=c['name'], slug=slugify(c['name']), description=c['description'])
+        for c in categories_data if c['name'] not in existing
+    ]
+    Category.objects.bulk_create(to_create, batch_size=500)
+    report('Catégories', [c.name for c in to_create], existing)
+    created_categories = list(Category.objects.filter(name__in=category_names))
+    categories_by_name = {c.name: c for c in created_categories}
 
     # 3. Créer des produits
     print("\n🥬 Création des produits...")
-    product_templates = [
-        {'category': 'Légumes', 'name': 'Tomates', 'description': 'Tomates bio', 'price': Decimal('4.50'), 'quantity_available': 50, 'unit': 'kg', 'is_organic': True, 'is_local': True},
-        {'category': 'Légumes', 'name': 'Courgettes', 'description': 'Courgettes bio', 'price': Decimal('3.20'), 'quantity_available': 30, 'unit': 'kg', 'is_organic': True, 'is_local': True},
-        {'category': 'Légumes', 'name': 'Carottes', 'description': 'Carottes bio', 'price': Decimal('2.90'), 'quantity_available': 60, 'unit': 'kg', 'is_organic': True, 'is_local': True},
-        {'category': 'Légumes', 'name': 'Salade', 'description': 'Mesclun frais', 'price': Decimal('2.80'), 'quantity_available': 25, 'unit': 'unit', 'is_organic': False, 'is_local': True},
-        {'category': 'Légumes', 'name': 'Radis', 'description': 'Radis croquants', 'price': Decimal('1.50'), 'quantity_available': 40, 'unit': 'unit', 'is_organic': False, 'is_local': True},
-        {'category': 'Légumes', 'name': 'Poireaux', 'description': 'Poireaux frais', 'price': Decimal('3.50'), 'quantity_available': 35, 'unit': 'kg', 'is_organic': False, 'is_local': True},
-        {'category': 'Fruits', 'name': 'Pommes', 'description': 'Pommes bio', 'price': Decimal('5.80'), 'quantity_available': 100, 'unit': 'kg', 'is_organic': True, 'is_local': True},
-        {'category': 'Fruits', 'name': 'Fraises', 'description': 'Fraises locales', 'price': Decimal('8.90'), 'quantity_available': 20, 'unit': 'unit', 'is_organic': False, 'is_local': True},
-        {'category': 'Fruits', 'name': 'Abricots', 'description': 'Abricots bio', 'price': Decimal('6.20'), 'quantity_available': 40, 'unit': 'kg', 'is_organic': True, 'is_local': True},
-        {'category': 'Fruits', 'name': 'Pêches', 'description': 'Pêches bio', 'price': Decimal('5.50'), 'quantity_available': 50, 'unit': 'kg', 'is_organic': True, 'is_local': True},
-        {'category': 'Produits laitiers', 'name': 'Fromage', 'description': 'Chèvre frais', 'price': Decimal('7.50'), 'quantity_available': 20, 'unit': 'unit', 'is_organic': True, 'is_local': True},
-        {'category': 'Produits laitiers', 'name': 'Yaourt', 'description': 'Yaourt bio', 'price': Decimal('3.80'), 'quantity_available': 50, 'unit': 'pack', 'is_organic': True, 'is_local': True},
-        {'category': 'Produits laitiers', 'name': 'Beurre', 'description': 'Beurre salé', 'price': Decimal('4.90'), 'quantity_available': 30, 'unit': 'unit', 'is_organic': False, 'is_local': True},
-        {'category': 'Viandes', 'name': 'Saucisson', 'description': 'Saucisson bio', 'price': Decimal('12.50'), 'quantity_available': 15, 'unit': 'unit', 'is_organic': True, 'is_local': True},
-        {'category': 'Viandes', 'name': 'Bœuf', 'description': 'Côte de bœuf', 'price': Decimal('25.00'), 'quantity_available': 10, 'unit': 'kg', 'is_organic': True, 'is_local': True},
-        {'category': 'Pain et céréales', 'name': 'Pain', 'description': 'Pain au levain', 'price': Decimal('4.00'), 'quantity_available': 25, 'unit': 'unit', 'is_organic': True, 'is_local': True},
-        {'category': 'Pain et céréales', 'name': 'Farine', 'description': 'Farine bio', 'price': Decimal('6.50'), 'quantity_available': 40, 'unit': 'kg', 'is_organic': True, 'is_local': True},
-        {'category': 'Épicerie', 'name': 'Miel', 'description': 'Miel bio', 'price': Decimal('9.80'), 'quantity_available': 20, 'unit': 'unit', 'is_organic': True, 'is_local': True},
-        {'category': 'Boissons', 'name': 'Jus', 'description': 'Jus de pomme', 'price': Decimal('4.00'), 'quantity_available': 30, 'unit': 'unit', 'is_organic': True, 'is_local': True},
-        {'category': 'Œufs', 'name': 'Œufs', 'description': 'Œufs bio', 'price': Decimal('3.50'), 'quantity_available': 50, 'unit': 'unit', 'is_organic': True, 'is_local': True},
-        {'category': 'Herbes et aromates', 'name': 'Basilic', 'description': 'Basilic frais', 'price': Decimal('2.00'), 'quantity_available': 30, 'unit': 'unit', 'is_organic': True, 'is_local': True},
-    ]
 
+    # Couples (producteur, nom) déjà en base : mêmes clés que l'ancien get_or_create
+    existing = set(
+        Product.objects.filter(producer__in=created_producers).values_list('producer_id', 'name')
+    )
     created_products = []
-    for producer in created_producers:
-        num_products = randint(4, 8)  # 4 à 8 produits par producteur
-        for _ in range(num_products):
-            template = choice(product_templates)
-            category = next(c for c in created_categories if c.name == template['category'])
+    # Tirages faits en une fois (random.choices) plutôt qu'à chaque itération
+    counts = [randint(4, 8) for _ in created_producers]  # 4 à 8 produits par producteur
+    draws = zip(
+        choices(PRODUCT_TEMPLATES, k=sum(counts)),
+        choices(QUANTITY_RANGE, k=sum(counts)),
+    )
+    for producer, num_products in zip(created_producers, counts):
+        for template, quantity in islice(draws, num_products):
+            category = categories_by_name[template['category']]
             # Truncate name to fit max_length=10
             base_name = template['name']
             truncated_name = base_name[:10]
-            product_data = {
-                'producer': producer,
-                'category': category,
-                'name': truncated_name,
-                'description': f"{template['description']} par {producer.business_name}"[:50],  # Limit description length
-                'price': template['price'],
-                'quantity_available': randint(10, 100),
-                'unit': template['unit'],
-                'is_organic': template['is_organic'],
-                'is_local': template['is_local'],
-            }
-            product, created = Product.objects.get_or_create(
-                name=product_data['name'],
-                producer=product_data['producer'],
-                defaults=product_data
-            )
-            if created:
-                print(f"✅ Produit créé: {product.name} - {product.producer.business_name}")
-            else:
-                print(f"ℹ️  Produit existe déjà: {product.name}")
-            created_products.append(product)
+            if (producer.id, truncated_name) in existing:
+                continue
+            existing.add((producer.id, truncated_name))
+            created_products.append(Product(
+                producer=producer,
+                category=category,
+                name=truncated_name,
+                description=f"{template['description']} par {producer.business_name}"[:50],  # Limit description length
+                price=template['price'],
+                quantity_available=quantity,
+                unit=template['unit'],
+                is_organic=template['is_organic'],
+                is_local=template['is_local'],
+            ))
+    Product.objects.bulk_create(created_products, batch_size=1000)
+    report(
+        'Produits',
+        [f"{p.name} - {p.producer.business_name}" for p in created_products],
+        (),
+    )
 
     print(f"\n🎉 Données de test créées avec succès!")
     print(f"📧 Comptes consommateurs ({len(created_consumers)}):")
@@ -354,5 +400,109 @@ def create_test_data():
     print(f"   - Swagger UI: http://127.0.0.1:8000/api/docs/")
     print(f"   - Admin: http://127.0.0.1:8000/admin/")
 
+
+# Colonnes écrites par le COPY : tous les champs NOT NULL de Product (les
+# valeurs par défaut Django ne sont pas des DEFAULT SQL)
+LOAD_TEST_COLUMNS = (
+    'id', 'producer_id', 'category_id', 'name', 'description', 'price', 'unit',
+    'quantity_available', 'rating', 'image_data', 'image_format',
+    'is_organic', 'is_local', 'is_active', 'created_at', 'updated_at',
+)
+
+
+@transaction.atomic
+def create_load_test_products(count):
+    """Ajoute ``count`` produits générés aux producteurs existants.
+
+    Aucun Product n'est instancié : les lignes sont envoyées en CSV via COPY
+    sur PostgreSQL, et par un INSERT unique rejoué par executemany ailleurs.
+    """
+    from django.db import connection
+    from django.utils import timezone
+    from accounts.models import Producer
+    from products.models import Category, Product
+
+    producers = list(Producer.objects.values_list('id', 'business_name'))
+    categories = dict(Category.objects.values_list('name', 'id'))
+    templates = [t for t in PRODUCT_TEMPLATES if t['category'] in categories]
+    if not producers or not templates:
+        print("❌ Aucun producteur ou catégorie : lancer d'abord create_test_data.py")
+        return
+
+    print(f"\n🏋️  Génération de {count} produits de charge...")
+    now = timezone.now()
+    rows = (
+        (
+            uuid.uuid4(), producer_id, categories[template['category']],
+            template['name'][:10],
+            f"{template['description']} par {business_name}"[:50],
+            template['price'], template['unit'], quantity,
+            '0.0', '', '', template['is_organic'], template['is_local'], True,
+            now, now,
+        )
+        for (producer_id, business_name), template, quantity in zip(
+            choices(producers, k=count),
+            choices(templates, k=count),
+            choices(QUANTITY_RANGE, k=count),
+        )
+    )
+
+    table = Product._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buf = io.StringIO()
+            csv.writer(buf).writerows(rows)
+            buf.seek(0)
+            # En CSV, un champ vide non quoté vaut NULL : image_data et
+            # image_format (NOT NULL, '') doivent rester des chaînes vides
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(LOAD_TEST_COLUMNS)}) FROM STDIN WITH "
+                f"(FORMAT csv, FORCE_NOT_NULL (image_data, image_format))",
+                buf,
+            )
+        else:
+            # Une seule requête INSERT préparée, rejouée par executemany ; les
+            # valeurs passent par get_db_prep_save() pour le format du backend
+            fields = [Product._meta.get_field(c.removesuffix('_id')) for c in LOAD_TEST_COLUMNS]
+            cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(LOAD_TEST_COLUMNS)}) "
+                f"VALUES ({', '.join(['%s'] * len(LOAD_TEST_COLUMNS))})",
+                [
+                    [f.get_db_prep_save(v, connection) for f, v in zip(fields, row)]
+                    for row in rows
+                ],
+            )
+    print(f"🥬 Produits de charge créés: {count}")
+
+
+# Compte présent dès la première exécution, y compris en mode --small
+REUSE_MARKER_EMAIL = 'consumer@test.com'
+
+
 if __name__ == '__main__':
-    create_test_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Crée les données de test GreenCart.")
+    parser.add_argument('--small', action='store_true',
+                        help="uniquement les données initiales")
+    parser.add_argument('--reuse', action='store_true',
+                        help="ne rien faire si les données initiales existent déjà")
+    parser.add_argument('--load-test', type=int, metavar='N', default=0,
+                        help="ajouter N produits générés pour les tests de charge")
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help="afficher le détail de chaque ligne")
+    parser.add_argument('--with-tokens', action='store_true',
+                        help="créer aussi les tokens API, sur la même connexion")
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
+    django.setup()
+    from django.contrib.auth import get_user_model
+
+    if args.reuse and get_user_model().objects.filter(email=REUSE_MARKER_EMAIL).exists():
+        print("ℹ️  Données de test déjà présentes, rien à faire (--reuse)")
+    else:
+        create_test_data(small=args.small, verbose=args.verbose)
+    if args.load_test > 0:
+        create_load_test_products(args.load_test)
+    if args.with_tokens:
+        from fix_swagger_auth import create_tokens_for_test_users
+        create_tokens_for_test_users()
@@ -5,26 +5,28 @@ Script pour corriger la configuration Swagger et ajouter l'authentification
 import os
 import django
 
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
-django.setup()
-
-from django.contrib.auth import get_user_model
-from rest_framework.authtoken.models import Token
+from django.db import transaction
 
+@transaction.atomic
 def create_tokens_for_test_users():
     """Crée des tokens pour les utilisateurs de test."""
+    from django.contrib.auth import get_user_model
+    from rest_framework.authtoken.models import Token
+
     User = get_user_model()
     
     # Créer des tokens pour tous les utilisateurs sans token
-    users = User.objects.filter(auth_token__isnull=True)
+    users = User.objects.filter(auth_token__isnull=True).only('id', 'email')
     
-    for user in users:
-        token, created = Token.objects.get_or_create(user=user)
-        if created:
-            print(f"✅ Token créé pour {user.email}: {token.key}")
-        else:
-            print(f"ℹ️  Token existe déjà pour {user.email}: {token.key}")
+    # bulk_create ne passe pas par Token.save() : la clé est générée ici
+    tokens = Token.objects.bulk_create(
+        [Token(user=user, key=Token.generate_key()) for user in users],
+        batch_size=500,
+    )
+    for token in tokens:
+        print(f"✅ Token créé pour {token.user.email}: {token.key}")
 
 if __name__ == '__main__':
-    create_tokens_for_test_users()
\ No newline at end of file
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.development')
+    django.setup()
+    create_tokens_for_test_users()
@@ -29,6 +29,8 @@ class OrderAdmin(admin.ModelAdmin):
         'consumer__first_name', 'consumer__last_name'
     ]
     raw_id_fields = ['consumer']
+    list_per_page = 50
+    show_full_result_count = False
     inlines = [OrderItemInline, OrderStatusHistoryInline]
     
     fieldsets = (
@@ -59,6 +61,18 @@ class OrderAdmin(admin.ModelAdmin):
     def total_amount_display(self, obj):
         return f"{obj.total_amount}€"
     total_amount_display.short_description = 'Total'
+    
+    def get_queryset(self, request):
+        """Optimiser les requêtes avec select_related."""
+        return super().get_queryset(request).select_related('consumer')
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Recherche par préfixe quand le terme ressemble à un numéro de commande."""
+        term = search_term.strip().upper()
+        if term.startswith('GC') and term[2:].isdigit():
+            # LIKE 'GC2025%' sur une seule colonne indexée, sans jointure sur consumer
+            return queryset.filter(order_number__startswith=term), False
+        return super().get_search_results(request, queryset, search_term)
 
 
 @admin.register(OrderItem)
@@ -76,6 +90,15 @@ class OrderItemAdmin(admin.ModelAdmin):
         'producer__business_name'
     ]
     raw_id_fields = ['order', 'product', 'producer']
+    list_per_page = 50
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        """Optimiser les requêtes avec select_related."""
+        # __str__ de Order, Product et Producer lit consumer, producer et user
+        return super().get_queryset(request).select_related(
+            'order__consumer', 'product__producer', 'producer__user'
+        )
 
 
 @admin.register(OrderStatusHistory)
@@ -89,4 +112,12 @@ class OrderStatusHistoryAdmin(admin.ModelAdmin):
         'order__order_number', 'changed_by__email',
         'reason'
     ]
-    raw_id_fields = ['order', 'changed_by']
\ No newline at end of file
+    raw_id_fields = ['order', 'changed_by']
+    list_per_page = 50
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        """Optimiser les requêtes avec select_related."""
+        return super().get_queryset(request).select_related(
+            'order__consumer', 'changed_by'
+        )
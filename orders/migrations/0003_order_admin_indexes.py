@@ -0,0 +1,49 @@
+from django.db import migrations, models
+
+
+def create_order_number_trgm_index(apps, schema_editor):
+    """Index trigramme pour les recherches ILIKE sur order_number (PostgreSQL uniquement)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS ord_number_trgm_idx '
+        'ON orders_order USING gin (order_number gin_trgm_ops)'
+    )
+
+
+def drop_order_number_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS ord_number_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0002_update_status_choices"),
+    ]
+
+    operations = [
+        # (status, -order_date) couvre aussi les filtres sur status seul
+        migrations.RemoveIndex(
+            model_name="order",
+            name="orders_orde_status_c6dd84_idx",
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["status", "-order_date"], name="ord_status_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["delivery_date"], name="ord_delivery_date_idx"
+            ),
+        ),
+        migrations.RunPython(
+            create_order_number_trgm_index,
+            drop_order_number_trgm_index,
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations, models
+
+
+def seed_order_number_sequences(apps, schema_editor):
+    """Initialise les compteurs à partir des numéros de commande existants."""
+    Order = apps.get_model('orders', 'Order')
+    OrderNumberSequence = apps.get_model('orders', 'OrderNumberSequence')
+    
+    last_numbers = {}
+    for order_number in Order.objects.values_list('order_number', flat=True).iterator():
+        # GC + année sur 4 chiffres + numéro séquentiel
+        year, number = order_number[2:6], order_number[6:]
+        if year.isdigit() and number.isdigit():
+            last_numbers[int(year)] = max(last_numbers.get(int(year), 0), int(number))
+    
+    OrderNumberSequence.objects.bulk_create([
+        OrderNumberSequence(year=year, last_number=number)
+        for year, number in last_numbers.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0003_order_admin_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderNumberSequence",
+            fields=[
+                (
+                    "year",
+                    models.PositiveIntegerField(
+                        primary_key=True, serialize=False, verbose_name="Année"
+                    ),
+                ),
+                (
+                    "last_number",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Dernier numéro"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Séquence des numéros de commande",
+                "verbose_name_plural": "Séquences des numéros de commande",
+            },
+        ),
+        migrations.RunPython(
+            seed_order_number_sequences,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+
+def migrate_confirmed_status(apps, schema_editor):
+    """Convertit l'ancien statut CONFIRMED (0001) en PROCESSING, son équivalent depuis 0002."""
+    Order = apps.get_model('orders', 'Order')
+    OrderStatusHistory = apps.get_model('orders', 'OrderStatusHistory')
+    
+    Order.objects.filter(status='CONFIRMED').update(status='PROCESSING')
+    OrderStatusHistory.objects.filter(old_status='CONFIRMED').update(old_status='PROCESSING')
+    OrderStatusHistory.objects.filter(new_status='CONFIRMED').update(new_status='PROCESSING')
+
+
+def analyze_orders(apps, schema_editor):
+    """Rafraîchit les statistiques du planificateur après la conversion."""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('ANALYZE orders_order')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0005_orderitem_producer_order_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(migrate_confirmed_status, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="order",
+            constraint=models.CheckConstraint(
+                condition=models.Q(
+                    status__in=[
+                        "PENDING",
+                        "PROCESSING",
+                        "READY",
+                        "SHIPPED",
+                        "DELIVERED",
+                        "CANCELLED",
+                    ]
+                ),
+                name="ord_status_valid",
+            ),
+        ),
+        migrations.RunPython(analyze_orders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations, models
+
+
+def fill_search_text(apps, schema_editor):
+    """Remplit search_text pour les commandes existantes."""
+    Order = apps.get_model('orders', 'Order')
+    
+    orders = Order.objects.select_related('consumer').only(
+        'id', 'order_number', 'consumer__email',
+        'consumer__first_name', 'consumer__last_name'
+    )
+    batch = []
+    for order in orders.iterator(chunk_size=1000):
+        consumer = order.consumer
+        order.search_text = ' '.join([
+            order.order_number, consumer.email, consumer.first_name, consumer.last_name
+        ]).lower()
+        batch.append(order)
+        if len(batch) == 1000:
+            Order.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    Order.objects.bulk_update(batch, ['search_text'])
+
+
+def create_search_text_trgm_index(apps, schema_editor):
+    """Index trigramme pour les recherches LIKE '%...%' sur search_text (PostgreSQL uniquement)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS ord_search_trgm_idx '
+        'ON orders_order USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_search_text_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS ord_search_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0006_order_status_check"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="search_text",
+            field=models.TextField(
+                blank=True,
+                default="",
+                editable=False,
+                verbose_name="Texte de recherche",
+            ),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(
+            create_search_text_trgm_index,
+            drop_search_text_trgm_index,
+        ),
+    ]
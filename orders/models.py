@@ -1,8 +1,13 @@
 """
 Models for orders management in GreenCart.
 """
+import time
 import uuid
-from django.db import models
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models.functions import Concat, Lower
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.core.validators import MinValueValidator
 from django.conf import settings
 from django.utils import timezone
@@ -124,6 +129,15 @@ class Order(models.Model):
         help_text='Notes laissées par le consommateur'
     )
     
+    # Numéro + email et nom du client, en minuscules : la recherche filtre
+    # cette colonne (index trigramme) au lieu de joindre les utilisateurs
+    search_text = models.TextField(
+        'Texte de recherche',
+        blank=True,
+        default='',
+        editable=False
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -133,8 +147,18 @@ class Order(models.Model):
         ordering = ['-order_date']
         indexes = [
             models.Index(fields=['consumer', '-order_date']),
-            models.Index(fields=['status']),
+            models.Index(fields=['status', '-order_date'], name='ord_status_date_idx'),
             models.Index(fields=['order_date']),
+            models.Index(fields=['delivery_date'], name='ord_delivery_date_idx'),
+        ]
+        constraints = [
+            # La base refuse les statuts hors STATUS_CHOICES (ex. l'ancien CONFIRMED)
+            models.CheckConstraint(
+                condition=models.Q(status__in=[
+                    'PENDING', 'PROCESSING', 'READY', 'SHIPPED', 'DELIVERED', 'CANCELLED'
+                ]),
+                name='ord_status_valid',
+            ),
         ]
     
     def __str__(self):
@@ -145,23 +169,28 @@ class Order(models.Model):
         if not self.order_number:
             # Format: GC2024001 (GreenCart + année + numéro séquentiel)
             year = timezone.now().year
-            last_order = Order.objects.filter(
-                order_number__startswith=f'GC{year}'
-            ).order_by('-order_number').first()
-            
-            if last_order and last_order.order_number:
-                last_num = int(last_order.order_number[-3:])
-                new_num = last_num + 1
-            else:
-                new_num = 1
-            
+            new_num = OrderNumberSequence.next_value(year)
             self.order_number = f'GC{year}{new_num:03d}'
         
+        if self._state.adding:
+            self.search_text = (
+                f'{self.order_number.lower()} {self.consumer_search_text(self.consumer)}'
+            )
+        
         super().save(*args, **kwargs)
     
+    @staticmethod
+    def consumer_search_text(consumer):
+        """Partie client du texte de recherche : email, prénom et nom en minuscules."""
+        return ' '.join([consumer.email, consumer.first_name, consumer.last_name]).lower()
+    
     @property
     def total_items(self):
         """Retourne le nombre total d'articles dans la commande."""
+        # Articles déjà préchargés (prefetch_related) : pas de requête SUM
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if 'items' in prefetched:
+            return sum(item.quantity for item in prefetched['items'])
         return self.items.aggregate(
             total=models.Sum('quantity')
         )['total'] or 0
@@ -169,9 +198,14 @@ class Order(models.Model):
     @property
     def producers_involved(self):
         """Retourne la liste des producteurs impliqués dans cette commande."""
-        return Producer.objects.filter(
-            id__in=self.items.values_list('producer_id', flat=True).distinct()
-        )
+        # Dédoublonnage en Python : aucune requête si items__producer est préchargé
+        items = self.items.all()
+        if 'items' not in getattr(self, '_prefetched_objects_cache', {}):
+            items = items.select_related('producer')
+        producers = {}
+        for item in items:
+            producers.setdefault(item.producer_id, item.producer)
+        return list(producers.values())
     
     @property
     def can_be_cancelled(self):
@@ -186,12 +220,28 @@ class Order(models.Model):
     def cancel(self):
         """Annule la commande et remet les stocks."""
         if self.can_be_cancelled:
-            # Remettre les stocks
-            for item in self.items.all():
-                item.product.increase_stock(item.quantity)
+            # Remettre les stocks : un seul UPDATE pour tous les produits
+            quantities = {}
+            for product_id, quantity in self.items.values_list('product_id', 'quantity'):
+                quantities[product_id] = quantities.get(product_id, 0) + quantity
+            if quantities:
+                Product.objects.filter(pk__in=quantities).update(
+                    quantity_available=models.Case(
+                        *[
+                            models.When(pk=product_id, then=models.F('quantity_available') + quantity)
+                            for product_id, quantity in quantities.items()
+                        ],
+                        default=models.F('quantity_available'),
+                        output_field=models.IntegerField()
+                    )
+                )
             
             self.status = 'CANCELLED'
-            self.save(update_fields=['status'])
+            self.updated_at = timezone.now()
+            Order.objects.filter(pk=self.pk).update(
+                status=self.status, updated_at=self.updated_at
+            )
+            invalidate_order_statistics()
             return True
         return False
     
@@ -261,6 +311,10 @@ class OrderItem(models.Model):
         verbose_name = 'Article de commande'
         verbose_name_plural = 'Articles de commande'
         ordering = ['created_at']
+        indexes = [
+            # Commandes d'un producteur (producer_orders, statistiques)
+            models.Index(fields=['producer', 'order'], name='orditem_producer_order_idx'),
+        ]
     
     def __str__(self):
         return f"{self.quantity}x {self.product.name} - Commande {self.order.order_number}"
@@ -271,7 +325,8 @@ class OrderItem(models.Model):
         
         # Copier le producteur depuis le produit si pas défini
         if not self.producer_id:
-            self.producer = self.product.producer
+            # Seul l'identifiant est copié : pas de chargement du Producer
+            self.producer_id = self.product.producer_id
         
         super().save(*args, **kwargs)
 
@@ -326,4 +381,83 @@ class OrderStatusHistory(models.Model):
         ordering = ['-changed_at']
     
     def __str__(self):
-        return f"{self.order.order_number}: {self.old_status} → {self.new_status}"
\ No newline at end of file
+        return f"{self.order.order_number}: {self.old_status} → {self.new_status}"
+
+
+class OrderNumberSequence(models.Model):
+    """
+    Compteur annuel des numéros de commande.
+    """
+    year = models.PositiveIntegerField('Année', primary_key=True)
+    last_number = models.PositiveIntegerField('Dernier numéro', default=0)
+    
+    class Meta:
+        verbose_name = 'Séquence des numéros de commande'
+        verbose_name_plural = 'Séquences des numéros de commande'
+    
+    def __str__(self):
+        return f"GC{self.year}: {self.last_number}"
+    
+    @classmethod
+    def next_value(cls, year):
+        """Incrémente et retourne le compteur de l'année.
+        
+        Un seul UPDATE ... RETURNING : la ligne reste verrouillée jusqu'au
+        commit, deux commandes simultanées ne peuvent pas obtenir le même numéro.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {cls._meta.db_table} SET last_number = last_number + 1 '
+                'WHERE year = %s RETURNING last_number',
+                [year]
+            )
+            row = cursor.fetchone()
+        if row is None:
+            # Première commande de l'année
+            cls.objects.get_or_create(year=year)
+            return cls.next_value(year)
+        return row[0]
+
+
+# Version des statistiques de commandes en cache : chaque écriture sur une
+# commande l'incrémente, ce qui invalide d'un coup toutes les entrées
+ORDER_STATS_VERSION_KEY = 'order_stats:version'
+
+
+def _bump_order_stats_version():
+    try:
+        cache.incr(ORDER_STATS_VERSION_KEY)
+    except ValueError:
+        # Clé absente ou évincée : repartir d'une valeur jamais utilisée
+        cache.set(ORDER_STATS_VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_order_statistics():
+    """
+    Invalide les statistiques de commandes en cache.
+    À appeler après toute écriture qui contourne save() (update(), bulk_update()).
+    """
+    # Après le commit : sinon une requête concurrente remettrait en cache
+    # les anciennes valeurs sous la nouvelle version
+    transaction.on_commit(_bump_order_stats_version)
+
+
+@receiver([post_save, post_delete], sender=Order)
+def order_changed(sender, instance, **kwargs):
+    """Signal invalidant les statistiques à chaque sauvegarde ou suppression de commande."""
+    invalidate_order_statistics()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_order_search_text(sender, instance, created, update_fields=None, **kwargs):
+    """Signal recopiant l'email et le nom du client dans le texte de recherche de ses commandes."""
+    if created:
+        return
+    if update_fields is not None and not {'email', 'first_name', 'last_name'} & set(update_fields):
+        # Ex. last_login à la connexion : rien à recopier
+        return
+    suffix = ' ' + Order.consumer_search_text(instance)
+    # Un seul UPDATE ; les commandes déjà à jour ne sont pas réécrites
+    Order.objects.filter(consumer=instance).exclude(search_text__endswith=suffix).update(
+        search_text=Concat(Lower('order_number'), models.Value(suffix))
+    )
@@ -1,15 +1,43 @@
 """
 Serializers for orders management in GreenCart.
 """
+from types import MappingProxyType
+
 from rest_framework import serializers
 from django.utils import timezone
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, Prefetch, Q, Sum, When
 from drf_spectacular.utils import extend_schema_field
-from .models import Order, OrderItem, OrderStatusHistory
+from .models import Order, OrderItem, OrderStatusHistory, invalidate_order_statistics
+from products.models import Product
 from products.serializers import ProductListSerializer
 from accounts.serializers import ProducerSerializer
 
 
+# Status labels, resolved once at import time
+STATUS_DISPLAY = dict(Order.STATUS_CHOICES)
+
+# Valid order status transitions
+VALID_TRANSITIONS = MappingProxyType({
+    'PENDING': frozenset({'PROCESSING', 'CANCELLED'}),
+    'PROCESSING': frozenset({'READY', 'CANCELLED'}),
+    'READY': frozenset({'SHIPPED', 'CANCELLED'}),
+    'SHIPPED': frozenset({'DELIVERED'}),
+    'DELIVERED': frozenset(),
+    'CANCELLED': frozenset(),
+})
+
+
+class SparseFieldsSerializerMixin:
+    """Keep only the fields listed in the ``fields`` keyword argument (all when None)."""
+    
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
     """Serializer for OrderItem model."""
     
@@ -29,8 +57,8 @@ class OrderStatusHistorySerializer(serializers.ModelSerializer):
     """Serializer for OrderStatusHistory model."""
     
     changed_by_name = serializers.CharField(source='changed_by.full_name', read_only=True)
-    old_status_display = serializers.CharField(source='get_old_status_display', read_only=True)
-    new_status_display = serializers.CharField(source='get_new_status_display', read_only=True)
+    old_status_display = serializers.SerializerMethodField()
+    new_status_display = serializers.SerializerMethodField()
     
     class Meta:
         model = OrderStatusHistory
@@ -40,16 +68,26 @@ class OrderStatusHistorySerializer(serializers.ModelSerializer):
             'changed_by', 'changed_by_name', 'reason', 'changed_at'
         ]
         read_only_fields = ['id', 'changed_at']
+    
+    @extend_schema_field(serializers.CharField)
+    def get_old_status_display(self, obj):
+        """Human-readable previous status."""
+        return STATUS_DISPLAY.get(obj.old_status, obj.old_status)
+    
+    @extend_schema_field(serializers.CharField)
+    def get_new_status_display(self, obj):
+        """Human-readable new status."""
+        return STATUS_DISPLAY.get(obj.new_status, obj.new_status)
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """Serializer for Order model."""
     
     items = OrderItemSerializer(many=True, read_only=True)
-    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    status_display = serializers.SerializerMethodField()
     status_history = OrderStatusHistorySerializer(many=True, read_only=True)
     total_items = serializers.IntegerField(read_only=True)
-    producers_involved = ProducerSerializer(many=True, read_only=True)
+    producers_involved = serializers.SerializerMethodField()
     can_be_cancelled = serializers.BooleanField(read_only=True)
     is_completed = serializers.BooleanField(read_only=True)
     
@@ -68,13 +106,58 @@ class OrderSerializer(serializers.ModelSerializer):
             'order_date', 'confirmed_at', 'shipped_at', 'delivered_at',
             'created_at', 'updated_at'
         ]
+    
+    @extend_schema_field(serializers.CharField)
+    def get_status_display(self, obj):
+        """Human-readable order status."""
+        return STATUS_DISPLAY.get(obj.status, obj.status)
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Prefetch nested relations (items, producers, status history)."""
+        return queryset.prefetch_related(
+            Prefetch(
+                'items',
+                queryset=OrderItem.objects.select_related('producer__user').only(
+                    'id', 'order', 'product', 'quantity', 'unit_price', 'total_price',
+                    'created_at',
+                    # ProducerSerializer: every producer column, and the user's
+                    # email and name parts (full_name falls back to username)
+                    'producer__user', 'producer__business_name', 'producer__description',
+                    'producer__siret', 'producer__address', 'producer__city',
+                    'producer__postal_code', 'producer__region', 'producer__is_verified',
+                    'producer__created_at', 'producer__updated_at',
+                    'producer__user__email', 'producer__user__first_name',
+                    'producer__user__last_name', 'producer__user__username',
+                ).prefetch_related(
+                    # One query for the distinct products, sales counters included
+                    Prefetch(
+                        'product',
+                        queryset=ProductListSerializer.setup_eager_loading(Product.objects.all())
+                    )
+                )
+            ),
+            Prefetch(
+                'status_history',
+                queryset=OrderStatusHistory.objects.select_related('changed_by').only(
+                    'id', 'order_id', 'old_status', 'new_status', 'reason', 'changed_at',
+                    'changed_by__id', 'changed_by__first_name',
+                    'changed_by__last_name', 'changed_by__username'
+                )
+            ),
+        )
+    
+    @extend_schema_field(ProducerSerializer(many=True))
+    def get_producers_involved(self, obj):
+        """Producers involved, deduplicated from the (prefetched) order items."""
+        return ProducerSerializer(obj.producers_involved, many=True, context=self.context).data
 
 
 class OrderListSerializer(serializers.ModelSerializer):
     """Simplified serializer for order listings."""
     
-    status_display = serializers.CharField(source='get_status_display', read_only=True)
-    total_items = serializers.IntegerField(read_only=True)
+    status_display = serializers.SerializerMethodField()
+    total_items = serializers.SerializerMethodField()
     producers_count = serializers.SerializerMethodField()
     
     class Meta:
@@ -85,10 +168,37 @@ class OrderListSerializer(serializers.ModelSerializer):
             'order_date', 'delivery_date', 'consumer_notes'
         ]
     
+    @extend_schema_field(serializers.CharField)
+    def get_status_display(self, obj):
+        """Human-readable order status."""
+        return STATUS_DISPLAY.get(obj.status, obj.status)
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Annotate list counters so a page is served by a single query."""
+        # Only the listed columns: skips the address and notes TEXT columns
+        return queryset.only(
+            'id', 'order_number', 'status', 'total_amount',
+            'order_date', 'delivery_date', 'consumer_notes'
+        ).annotate(
+            producers_count=Count('items__producer', distinct=True),
+            total_quantity=Sum('items__quantity'),
+        )
+    
+    @extend_schema_field(serializers.IntegerField)
+    def get_total_items(self, obj):
+        """Total quantity of items, from the annotation when available."""
+        if hasattr(obj, 'total_quantity'):
+            return obj.total_quantity or 0
+        return obj.total_items
+    
     @extend_schema_field(serializers.IntegerField)
     def get_producers_count(self, obj):
         """Count number of producers involved in this order."""
-        return obj.producers_involved.count()
+        if hasattr(obj, 'producers_count'):
+            return obj.producers_count
+        # Only the producer ids are needed: no Producer rows, no DISTINCT
+        return len({item.producer_id for item in obj.items.all()})
 
 
 class CreateOrderSerializer(serializers.Serializer):
@@ -115,12 +225,19 @@ class CreateOrderSerializer(serializers.Serializer):
             if not cart.items.exists():
                 raise serializers.ValidationError("Cart is empty.")
             
-            # Check that all items are still available
-            for item in cart.items.all():
-                if not item.is_available():
-                    raise serializers.ValidationError(
-                        f"Product '{item.product.name}' is no longer available in requested quantity."
-                    )
+            # Check that all items are still available (same rule as
+            # CartItem.is_available(), for the whole cart in one query)
+            unavailable = list(
+                cart.items.filter(
+                    Q(product__is_active=False) |
+                    Q(quantity__gt=F('product__quantity_available'))
+                ).values_list('product__name', flat=True)
+            )
+            if unavailable:
+                raise serializers.ValidationError(
+                    "Products no longer available in requested quantity: "
+                    + ", ".join(f"'{name}'" for name in unavailable)
+                )
         except AttributeError:
             raise serializers.ValidationError("Cart not found.")
         
@@ -131,9 +248,10 @@ class CreateOrderSerializer(serializers.Serializer):
         """Create order from cart."""
         request = self.context.get('request')
         cart = request.user.cart
+        cart_items = list(cart.items.select_related('product'))
         
         # Calculate total amount
-        total_amount = cart.total_amount
+        total_amount = sum(item.total_price for item in cart_items)
         
         # Create order
         order = Order.objects.create(
@@ -147,18 +265,40 @@ class CreateOrderSerializer(serializers.Serializer):
             status='PENDING'
         )
         
-        # Create order items from cart items
-        for cart_item in cart.items.all():
-            OrderItem.objects.create(
+        # Create order items from cart items (bulk_create skips OrderItem.save())
+        OrderItem.objects.bulk_create([
+            OrderItem(
                 order=order,
                 product=cart_item.product,
-                producer=cart_item.product.producer,
+                producer_id=cart_item.product.producer_id,
                 quantity=cart_item.quantity,
-                unit_price=cart_item.price_at_time
+                unit_price=cart_item.price_at_time,
+                total_price=cart_item.total_price
+            )
+            for cart_item in cart_items
+        ], batch_size=500)
+        
+        # Reduce product stock in a single UPDATE. quantity_available is a
+        # PositiveIntegerField (CHECK >= 0): if a concurrent order consumed the
+        # stock since validate(), the UPDATE fails and the whole order rolls back
+        try:
+            Product.objects.filter(
+                pk__in=[cart_item.product_id for cart_item in cart_items]
+            ).update(quantity_available=Case(
+                *[
+                    When(
+                        pk=cart_item.product_id,
+                        then=F('quantity_available') - cart_item.quantity
+                    )
+                    for cart_item in cart_items
+                ],
+                default=F('quantity_available'),
+                output_field=IntegerField()
+            ))
+        except IntegrityError:
+            raise serializers.ValidationError(
+                "Some products are no longer available in requested quantity."
             )
-            
-            # Reduce product stock
-            cart_item.product.reduce_stock(cart_item.quantity)
         
         # Clear cart
         cart.clear()
@@ -187,17 +327,7 @@ class UpdateOrderStatusSerializer(serializers.Serializer):
         new_status = attrs['status']
         current_status = order.status
         
-        # Define valid status transitions
-        valid_transitions = {
-            'PENDING': ['PROCESSING', 'CANCELLED'],
-            'PROCESSING': ['READY', 'CANCELLED'],
-            'READY': ['SHIPPED', 'CANCELLED'],
-            'SHIPPED': ['DELIVERED'],
-            'DELIVERED': [],
-            'CANCELLED': [],
-        }
-        
-        if new_status not in valid_transitions.get(current_status, []):
+        if new_status not in VALID_TRANSITIONS.get(current_status, frozenset()):
             raise serializers.ValidationError(
                 f"Cannot change status from {current_status} to {new_status}."
             )
@@ -214,19 +344,20 @@ class UpdateOrderStatusSerializer(serializers.Serializer):
         new_status = self.validated_data['status']
         reason = self.validated_data.get('reason', '')
         
-        # Update order status
-        order.status = new_status
-        
-        # Update timestamp fields
+        # Update order status and timestamp fields (only these columns)
         now = timezone.now()
+        updates = {'status': new_status, 'updated_at': now}
         if new_status == 'PROCESSING':
-            order.confirmed_at = now
+            updates['confirmed_at'] = now
         elif new_status == 'SHIPPED':
-            order.shipped_at = now
+            updates['shipped_at'] = now
         elif new_status == 'DELIVERED':
-            order.delivered_at = now
+            updates['delivered_at'] = now
         
-        order.save()
+        Order.objects.filter(pk=order.pk).update(**updates)
+        for field, value in updates.items():
+            setattr(order, field, value)
+        invalidate_order_statistics()
         
         # Create status history
         OrderStatusHistory.objects.create(
@@ -1 +1,155 @@
-# Tests will be implemented later
\ No newline at end of file
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import Producer
+from cart.models import Cart, CartItem
+from products.models import Category, Product
+from .models import Order, OrderItem
+
+User = get_user_model()
+
+
+class OrderQueryCountTest(APITestCase):
+    """Nombre de requêtes des endpoints de commandes (4 commandes × 3 articles)."""
+
+    def setUp(self):
+        """Créer un client, trois producteurs et quatre commandes de trois articles."""
+        self.consumer = User.objects.create_user(
+            username='client',
+            email='client@example.com',
+            password='testpass123',
+            first_name='Camille',
+            last_name='Martin'
+        )
+
+        category = Category.objects.create(name='Légumes')
+        products = []
+        for i in range(3):
+            user = User.objects.create_user(
+                username=f'producteur{i}',
+                email=f'producteur{i}@example.com',
+                password='testpass123',
+                user_type='PRODUCER'
+            )
+            producer = Producer.objects.create(
+                user=user,
+                business_name=f'Ferme {i}',
+                description='Maraîchage bio',
+                siret=f'1234567890123{i}',
+                address='1 chemin des Champs',
+                city='Lyon',
+                postal_code='69001',
+                region='Auvergne-Rhône-Alpes'
+            )
+            products.append(Product.objects.create(
+                producer=producer,
+                category=category,
+                name=f'Produit {i}',
+                description='Produit frais',
+                price=Decimal('2.50'),
+                quantity_available=50
+            ))
+
+        self.products = products
+        self.orders = []
+        for _ in range(4):
+            order = Order.objects.create(
+                consumer=self.consumer,
+                delivery_address='2 rue de la Gare',
+                delivery_city='Lyon',
+                delivery_postal_code='69002',
+                total_amount=Decimal('15.00')
+            )
+            for product in products:
+                OrderItem.objects.create(
+                    order=order,
+                    product=product,
+                    quantity=2,
+                    unit_price=product.price
+                )
+            self.orders.append(order)
+
+        self.client.force_authenticate(user=self.consumer)
+
+    def test_my_orders_query_count(self):
+        """Mes commandes : profil producteur, commandes, articles, produits, historique."""
+        # Indépendant du nombre de commandes et d'articles
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('api:orders:my_orders'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        producer = response.data['results'][0]['items'][0]['producer']
+        self.assertEqual(producer['city'], 'Lyon')
+
+    def test_my_orders_sales_counters(self):
+        """Les compteurs de ventes annotés ne comptent que les commandes livrées."""
+        Order.objects.filter(pk=self.orders[0].pk).update(status='DELIVERED')
+
+        response = self.client.get(reverse('api:orders:my_orders'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        product = response.data['results'][0]['items'][0]['product']
+        self.assertEqual(product['sales_count'], 2)
+        self.assertEqual(product['total_revenue'], Decimal('5.00'))
+
+    def test_order_detail_query_count(self):
+        """Détail : profil producteur, commande, articles, produits, historique."""
+        order = self.orders[0]
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                reverse('api:orders:order_detail', kwargs={'order_id': order.id})
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['producers_involved']), 3)
+        self.assertEqual(
+            response.data['producers_involved'][0]['full_address'],
+            '1 chemin des Champs, 69001 Lyon'
+        )
+
+    def test_create_from_cart_query_count(self):
+        """Création depuis le panier : nombre de requêtes indépendant du nombre d'articles."""
+        cart = Cart.objects.create(consumer=self.consumer)
+        for product in self.products[:2]:
+            CartItem.objects.create(cart=cart, product=product, quantity=1, price_at_time=product.price)
+
+        with self.assertNumQueries(15):
+            response = self.client.post(reverse('api:orders:create_from_cart'), {
+                'delivery_address': '2 rue de la Gare',
+                'delivery_city': 'Lyon',
+                'delivery_postal_code': '69002',
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['order']['items']), 2)
+        self.assertFalse(cart.items.exists())
+
+    def test_order_list_query_count(self):
+        """Liste : profil producteur puis une requête avec les compteurs annotés."""
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('api:orders:order-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(response.data['results'][0]['total_items'], 6)
+        self.assertEqual(response.data['results'][0]['producers_count'], 3)
+
+    def test_order_list_cursor_keeps_id_tiebreaker(self):
+        """La pagination par curseur trie toujours sur (order_date, id), même avec ?ordering."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('api:orders:order-list'), {'ordering': 'status'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sql = queries.captured_queries[-1]['sql']
+        self.assertIn('ORDER BY "orders_order"."order_date" DESC, "orders_order"."id" DESC', sql)
+        expected = sorted(self.orders, key=lambda order: (order.order_date, order.id), reverse=True)
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [str(order.id) for order in expected]
+        )
@@ -1,16 +1,21 @@
 """
 API views for orders management in GreenCart.
 """
+from decimal import Decimal
+
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.pagination import CursorPagination
+from rest_framework.filters import SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Q, Sum
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample
 from drf_spectacular.openapi import OpenApiTypes, OpenApiResponse
 
-from .models import Order, OrderItem, OrderStatusHistory
+from .models import ORDER_STATS_VERSION_KEY, Order, OrderItem, OrderStatusHistory
 from .serializers import (
     OrderSerializer,
     OrderListSerializer,
@@ -22,6 +27,40 @@ from .serializers import (
 )
 
 
+# Fields returned by the write actions unless ?fields= asks for more
+ORDER_WRITE_RESPONSE_FIELDS = ('id', 'status', 'updated_at')
+
+# OrderSerializer fields read from the order's relations
+NESTED_ORDER_FIELDS = frozenset({'items', 'status_history', 'producers_involved', 'total_items'})
+
+# Query parameter shared by the order write endpoints
+FIELDS_PARAMETER = OpenApiParameter(
+    'fields', OpenApiTypes.STR,
+    description="Champs de la commande à renvoyer, séparés par des virgules ('full' : tous)"
+)
+
+# Seconds a user's order statistics stay cached
+ORDER_STATISTICS_CACHE_TIMEOUT = 30
+
+
+class OrderSearchFilter(SearchFilter):
+    """Search terms matched against Order.search_text, without joining the consumer."""
+    
+    def filter_queryset(self, request, queryset, view):
+        # search_text is stored lowercased: a plain LIKE '%term%' (not
+        # UPPER(...) LIKE) so PostgreSQL can use ord_search_trgm_idx
+        for term in self.get_search_terms(request):
+            queryset = queryset.filter(search_text__contains=term.lower())
+        return queryset
+
+
+class OrderCursorPagination(CursorPagination):
+    """Keyset pagination on order date: no COUNT(*), no OFFSET scan."""
+    
+    # id breaks ties between orders placed in the same instant
+    ordering = ('-order_date', '-id')
+
+
 @extend_schema_view(
     list=extend_schema(
         tags=['Orders'],
@@ -62,11 +101,14 @@ class OrderViewSet(viewsets.ModelViewSet):
     """ViewSet for orders management."""
     
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # No OrderingFilter: the cursor must walk the unique (order_date, id) key,
+    # a client-chosen ordering would drop the tiebreaker
+    filter_backends = [DjangoFilterBackend, OrderSearchFilter]
     filterset_fields = ['status', 'consumer', 'order_date']
-    search_fields = ['order_number', 'consumer__email', 'consumer__first_name', 'consumer__last_name']
-    ordering_fields = ['order_date', 'total_amount', 'status']
-    ordering = ['-order_date']
+    # Order number, consumer email and name, denormalized on the order
+    search_fields = ['search_text']
+    ordering = ['-order_date', '-id']
+    pagination_class = OrderCursorPagination
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -76,21 +118,39 @@ class OrderViewSet(viewsets.ModelViewSet):
             return CreateOrderSerializer
         return OrderSerializer
     
+    @classmethod
+    def _base_queryset(cls, action=None):
+        """Order queryset eager-loaded for the serializer that renders it."""
+        if action == 'list':
+            # Listings never touch the items: annotated counters only
+            return OrderListSerializer.setup_eager_loading(Order.objects.all())
+        return OrderSerializer.setup_eager_loading(Order.objects.all())
+    
     def get_queryset(self):
         """Filter queryset based on user type."""
         user = self.request.user
         
+        if self.action in ('list', 'retrieve', 'update', 'partial_update'):
+            queryset = self._base_queryset(self.action)
+        else:
+            # cancel/update_status re-serialize after writing: no stale prefetch cache there
+            queryset = Order.objects.all()
+        
         if user.is_staff or user.is_superuser:
             # Staff can see all orders
-            return Order.objects.all()
-        elif hasattr(user, 'producer_profile'):
-            # Producers can see orders containing their products
-            return Order.objects.filter(
-                items__producer=user.producer_profile
-            ).distinct()
-        else:
-            # Consumers can only see their own orders
-            return Order.objects.filter(consumer=user)
+            if self.action == 'update_status' and hasattr(user, 'producer_profile'):
+                # Membership flag computed with the fetch, read by update_status
+                queryset = queryset.annotate(
+                    has_my_items=_contains_products_of(user.producer_profile)
+                )
+            return queryset
+        if hasattr(user, 'producer_profile'):
+            # Producers can see orders containing their products.
+            # EXISTS instead of join + distinct() so that list annotations
+            # count every item of the order, not only the producer's ones
+            return queryset.filter(_contains_products_of(user.producer_profile))
+        # Consumers can only see their own orders
+        return queryset.filter(consumer=user)
     
     def perform_create(self, serializer):
         """Create order from user's cart."""
@@ -106,15 +166,16 @@ class OrderViewSet(viewsets.ModelViewSet):
             200: {"description": "Commande annulée avec succès"},
             403: {"description": "Permission refusée"},
             400: {"description": "Erreurs de validation"}
-        }
+        },
+        parameters=[FIELDS_PARAMETER]
     )
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
         """Cancel an order (consumer only)."""
         order = self.get_object()
         
-        # Only the consumer can cancel their order
-        if order.consumer != request.user:
+        # Only the consumer can cancel their order (compared by id: no User fetch)
+        if order.consumer_id != request.user.id:
             return Response(
                 {'error': 'You can only cancel your own orders.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -127,10 +188,9 @@ class OrderViewSet(viewsets.ModelViewSet):
         
         if serializer.is_valid():
             cancelled_order = serializer.save()
-            order_serializer = OrderSerializer(cancelled_order)
             return Response({
                 'message': 'Order cancelled successfully.',
-                'order': order_serializer.data
+                'order': _order_payload(request, cancelled_order, ORDER_WRITE_RESPONSE_FIELDS)
             })
         
         return Response(
@@ -147,7 +207,8 @@ class OrderViewSet(viewsets.ModelViewSet):
             200: {"description": "Statut mis à jour avec succès"},
             403: {"description": "Permission refusée"},
             400: {"description": "Erreurs de validation"}
-        }
+        },
+        parameters=[FIELDS_PARAMETER]
     )
     @action(detail=True, methods=['post'])
     def update_status(self, request, pk=None):
@@ -161,8 +222,9 @@ class OrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        producer = request.user.producer_profile
-        if not order.items.filter(producer=producer).exists():
+        # get_queryset already restricts producers to their orders; staff
+        # accounts with a producer profile get the has_my_items annotation
+        if not getattr(order, 'has_my_items', True):
             return Response(
                 {'error': 'You can only update status for orders containing your products.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -175,10 +237,9 @@ class OrderViewSet(viewsets.ModelViewSet):
         
         if serializer.is_valid():
             updated_order = serializer.save()
-            order_serializer = OrderSerializer(updated_order)
             return Response({
                 'message': 'Order status updated successfully.',
-                'order': order_serializer.data
+                'order': _order_payload(request, updated_order, ORDER_WRITE_RESPONSE_FIELDS)
             })
         
         return Response(
@@ -187,6 +248,31 @@ class OrderViewSet(viewsets.ModelViewSet):
         )
 
 
+def _order_payload(request, order, default_fields=None):
+    """
+    Serialize an order after a write, restricted to the ?fields= list
+    ('full': every field; absent: default_fields, None meaning every field).
+    """
+    fields = request.query_params.get('fields')
+    if not fields:
+        fields = default_fields
+    elif fields == 'full':
+        fields = None
+    else:
+        fields = [name.strip() for name in fields.split(',') if name.strip()]
+    
+    if fields is None or NESTED_ORDER_FIELDS.intersection(fields):
+        # Reload with every relation prefetched in a fixed number of queries
+        order = OrderViewSet._base_queryset().get(pk=order.pk)
+    return OrderSerializer(order, fields=fields).data
+
+
+def _contains_products_of(producer):
+    """Semi-join filter: orders with at least one item from the producer."""
+    # Probes orditem_producer_order_idx once per order, stops at the first match
+    return Exists(OrderItem.objects.filter(order=OuterRef('pk'), producer=producer))
+
+
 @extend_schema(
     tags=['Orders'],
     summary="Mes commandes",
@@ -198,18 +284,19 @@ class OrderViewSet(viewsets.ModelViewSet):
 def my_orders(request):
     """Get current user's orders."""
     user = request.user
+    orders = OrderViewSet._base_queryset()
     
     if hasattr(user, 'producer_profile'):
         # Producer - get orders containing their products
-        orders = Order.objects.filter(
-            items__producer=user.producer_profile
-        ).distinct().order_by('-order_date')
+        orders = orders.filter(_contains_products_of(user.producer_profile))
     else:
         # Consumer - get their own orders
-        orders = Order.objects.filter(consumer=user).order_by('-order_date')
+        orders = orders.filter(consumer=user)
     
-    serializer = OrderSerializer(orders, many=True)
-    return Response(serializer.data)
+    paginator = OrderCursorPagination()
+    page = paginator.paginate_queryset(orders, request)
+    serializer = OrderSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
 
 
 @extend_schema(
@@ -239,17 +326,20 @@ def producer_orders(request):
         )
     
     producer = request.user.producer_profile
-    orders = Order.objects.filter(
-        items__producer=producer
-    ).distinct().order_by('-order_date')
+    # EXISTS instead of join + distinct(): with a status filter the planner
+    # can walk ord_status_date_idx in order_date order, no DISTINCT sort
+    orders = OrderViewSet._base_queryset().filter(_contains_products_of(producer))
     
     # Add filtering options
     status_filter = request.query_params.get('status')
     if status_filter:
         orders = orders.filter(status=status_filter)
     
-    serializer = OrderSerializer(orders, many=True)
-    return Response(serializer.data)
+    # The paginator orders by -order_date, -id
+    paginator = OrderCursorPagination()
+    page = paginator.paginate_queryset(orders, request)
+    serializer = OrderSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
 
 
 @extend_schema(
@@ -257,40 +347,34 @@ def producer_orders(request):
     description="Get detailed information about a specific order. Consumers can see their own orders, producers can see orders containing their products, staff can see all orders.",
     responses={
         200: OrderSerializer,
-        404: OpenApiResponse(description="Order not found"),
-        403: OpenApiResponse(description="Permission denied")
+        404: OpenApiResponse(description="Order not found or not visible to the user")
     }
 )
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def order_detail(request, order_id):
     """Get order details."""
+    user = request.user
+    orders = OrderViewSet._base_queryset()
+    
+    # Permissions are part of the query: an order the user may not see is
+    # indistinguishable from a missing one (no id enumeration)
+    if not (user.is_staff or user.is_superuser):
+        # Consumer can see their own orders
+        visible = Q(consumer=user)
+        if hasattr(user, 'producer_profile'):
+            # Producer can see orders containing their products
+            visible |= _contains_products_of(user.producer_profile)
+        orders = orders.filter(visible)
+    
     try:
-        order = Order.objects.get(id=order_id)
+        order = orders.get(id=order_id)
     except Order.DoesNotExist:
         return Response(
             {'error': 'Order not found.'},
             status=status.HTTP_404_NOT_FOUND
         )
     
-    # Check permissions
-    user = request.user
-    if user.is_staff or user.is_superuser:
-        # Staff can see all orders
-        pass
-    elif order.consumer == user:
-        # Consumer can see their own order
-        pass
-    elif (hasattr(user, 'producer_profile') and 
-          order.items.filter(producer=user.producer_profile).exists()):
-        # Producer can see orders containing their products
-        pass
-    else:
-        return Response(
-            {'error': 'Permission denied.'},
-            status=status.HTTP_403_FORBIDDEN
-        )
-    
     serializer = OrderSerializer(order)
     return Response(serializer.data)
 
@@ -303,7 +387,8 @@ def order_detail(request, order_id):
     responses={
         201: {"description": "Commande créée avec succès"},
         400: {"description": "Erreurs de validation ou panier vide"}
-    }
+    },
+    parameters=[FIELDS_PARAMETER]
 )
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -316,10 +401,9 @@ def create_order_from_cart(request):
     
     if serializer.is_valid():
         order = serializer.save()
-        order_serializer = OrderSerializer(order)
         return Response({
             'message': 'Order created successfully.',
-            'order': order_serializer.data
+            'order': _order_payload(request, order)
         }, status=status.HTTP_201_CREATED)
     
     return Response(
@@ -328,6 +412,18 @@ def create_order_from_cart(request):
     )
 
 
+def _status_counts(orders, **extra):
+    """Count orders per status (plus any extra aggregates) in one query."""
+    return orders.aggregate(
+        total_orders=Count('id'),
+        **{
+            f'{code.lower()}_orders': Count('id', filter=Q(status=code))
+            for code, _ in Order.STATUS_CHOICES
+        },
+        **extra
+    )
+
+
 @extend_schema(
     tags=['Orders'],
     summary="Statistiques des commandes",
@@ -356,41 +452,33 @@ def order_statistics(request):
     """Get order statistics."""
     user = request.user
     
+    # Short-lived per-user cache; any order write bumps the version
+    cache_key = f'order_stats:{cache.get(ORDER_STATS_VERSION_KEY, 0)}:{user.id}'
+    stats = cache.get(cache_key)
+    if stats is not None:
+        return Response(stats)
+    
     if hasattr(user, 'producer_profile'):
         # Producer statistics
         producer = user.producer_profile
-        orders = Order.objects.filter(items__producer=producer).distinct()
+        orders = Order.objects.filter(_contains_products_of(producer))
         
-        stats = {
-            'total_orders': orders.count(),
-            'pending_orders': orders.filter(status='PENDING').count(),
-            'processing_orders': orders.filter(status='PROCESSING').count(),
-            'ready_orders': orders.filter(status='READY').count(),
-            'shipped_orders': orders.filter(status='SHIPPED').count(),
-            'delivered_orders': orders.filter(status='DELIVERED').count(),
-            'cancelled_orders': orders.filter(status='CANCELLED').count(),
-            'total_revenue': sum(
-                item.total_price for item in OrderItem.objects.filter(
-                    producer=producer,
-                    order__status='DELIVERED'
-                )
-            )
-        }
+        stats = _status_counts(orders)
+        # Revenue lives on the producer's own items, summed by the database
+        stats['total_revenue'] = OrderItem.objects.filter(
+            producer=producer,
+            order__status='DELIVERED'
+        ).aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
     else:
         # Consumer statistics
         orders = Order.objects.filter(consumer=user)
         
-        stats = {
-            'total_orders': orders.count(),
-            'pending_orders': orders.filter(status='PENDING').count(),
-            'processing_orders': orders.filter(status='PROCESSING').count(),
-            'ready_orders': orders.filter(status='READY').count(),
-            'shipped_orders': orders.filter(status='SHIPPED').count(),
-            'delivered_orders': orders.filter(status='DELIVERED').count(),
-            'cancelled_orders': orders.filter(status='CANCELLED').count(),
-            'total_spent': sum(
-                order.total_amount for order in orders.filter(status='DELIVERED')
-            )
-        }
+        stats = _status_counts(
+            orders,
+            total_spent=Sum('total_amount', filter=Q(status='DELIVERED'))
+        )
+        if stats['total_spent'] is None:
+            stats['total_spent'] = Decimal('0.00')
     
+    cache.set(cache_key, stats, ORDER_STATISTICS_CACHE_TIMEOUT)
     return Response(stats)
\ No newline at end of file
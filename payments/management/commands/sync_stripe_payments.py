@@ -1,16 +1,30 @@
 """
 Management command to sync payments with Stripe.
 """
+from concurrent.futures import ThreadPoolExecutor
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 import stripe
-from payments.models import Payment
+from orders.models import Order, invalidate_order_statistics
+from payments.models import Payment, invalidate_payment_stats
 from payments.stripe_client import StripeClient
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Stripe PaymentIntent status -> Payment status
+_STRIPE_STATUS_MAP = {
+    'requires_payment_method': 'PENDING',
+    'requires_confirmation': 'PENDING',
+    'requires_action': 'PENDING',
+    'processing': 'PROCESSING',
+    'requires_capture': 'PROCESSING',
+    'canceled': 'CANCELLED',
+    'succeeded': 'SUCCEEDED',
+}
+
 
 class Command(BaseCommand):
     help = 'Sync payment statuses with Stripe'
@@ -27,6 +41,12 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be updated without making changes'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=16,
+            help='Concurrent Stripe requests for individually retrieved payments (default: 16)'
+        )
     
     def handle(self, *args, **options):
         days = options['days']
@@ -34,66 +54,60 @@ class Command(BaseCommand):
         
         # Get payments from the last N days that might need syncing
         cutoff_date = timezone.now() - timedelta(days=days)
+        # Only the columns the sync reads: no client secret, no metadata JSON
         payments_to_sync = Payment.objects.filter(
             created_at__gte=cutoff_date,
             status__in=['PENDING', 'PROCESSING']
-        )
+        ).only('id', 'status', 'stripe_payment_intent_id', 'order_id')
         
         self.stdout.write(
             f"Found {payments_to_sync.count()} payments to sync from the last {days} days"
         )
         
+        # One paginated listing (100 intents per call) instead of one
+        # retrieve per payment
+        payment_intents = self._list_payment_intents(cutoff_date)
+        
         updated_count = 0
         error_count = 0
+        # Status changes are collected here and written in bulk after the loop
+        changes = {'SUCCEEDED': [], 'FAILED': [], 'other': []}
+        # Intents missing from the listing: created before the cutoff (payment
+        # row saved just after it), retrieved individually below
+        to_retrieve = []
         
-        for payment in payments_to_sync:
-            try:
-                # Retrieve current status from Stripe
-                payment_intent = StripeClient.retrieve_payment_intent(
-                    payment.stripe_payment_intent_id
-                )
-                
-                old_status = payment.status
-                new_status = self._map_stripe_status(payment_intent.status)
-                
-                if old_status != new_status:
-                    if not dry_run:
-                        payment.status = new_status
-                        if new_status == 'SUCCEEDED':
-                            payment.mark_as_succeeded()
-                            # Also confirm the order if needed
-                            if payment.order.status == 'PENDING':
-                                payment.order.confirm()
-                        elif new_status == 'FAILED':
-                            failure_reason = ''
-                            if hasattr(payment_intent, 'last_payment_error') and payment_intent.last_payment_error:
-                                failure_reason = payment_intent.last_payment_error.get('message', '')
-                            payment.mark_as_failed(failure_reason)
-                        else:
-                            payment.save()
-                    
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f"{'[DRY RUN] ' if dry_run else ''}Updated payment {payment.id}: "
-                            f"{old_status} -> {new_status}"
-                        )
-                    )
-                    updated_count += 1
-                
-            except stripe.error.StripeError as e:
+        # Streamed in chunks (server-side cursor on PostgreSQL): the queryset
+        # result cache never holds the whole backlog
+        for payment in payments_to_sync.iterator(chunk_size=500):
+            payment_intent = payment_intents.get(payment.stripe_payment_intent_id)
+            if payment_intent is None:
+                to_retrieve.append(payment)
+            elif self._record_change(payment, payment_intent, changes, dry_run):
+                updated_count += 1
+        
+        retrieved = self._retrieve_payment_intents(to_retrieve, options['workers'])
+        for payment, payment_intent, error in retrieved:
+            if isinstance(error, stripe.error.StripeError):
                 self.stdout.write(
                     self.style.ERROR(
-                        f"Stripe error for payment {payment.id}: {e}"
+                        f"Stripe error for payment {payment.id}: {error}"
                     )
                 )
                 error_count += 1
-            except Exception as e:
+            elif error is not None:
                 self.stdout.write(
                     self.style.ERROR(
-                        f"Error syncing payment {payment.id}: {e}"
+                        f"Error syncing payment {payment.id}: {error}"
                     )
                 )
                 error_count += 1
+            elif self._record_change(payment, payment_intent, changes, dry_run):
+                updated_count += 1
+        
+        if not dry_run:
+            self._save_status_changes(
+                changes['SUCCEEDED'], changes['FAILED'], changes['other']
+            )
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -101,15 +115,95 @@ class Command(BaseCommand):
             )
         )
     
+    def _record_change(self, payment, payment_intent, changes, dry_run):
+        """Queue the payment's status change, if any; return whether it changed."""
+        old_status = payment.status
+        new_status = self._map_stripe_status(payment_intent.status)
+        if old_status == new_status:
+            return False
+        
+        payment.status = new_status
+        if new_status == 'SUCCEEDED':
+            changes['SUCCEEDED'].append(payment)
+        elif new_status == 'FAILED':
+            payment.failure_reason = (
+                getattr(payment_intent, 'last_payment_error', None) or {}
+            ).get('message', '')
+            changes['FAILED'].append(payment)
+        else:
+            changes['other'].append(payment)
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'[DRY RUN] ' if dry_run else ''}Updated payment {payment.id}: "
+                f"{old_status} -> {new_status}"
+            )
+        )
+        return True
+    
+    def _retrieve_payment_intents(self, payments, workers):
+        """
+        Retrieve the PaymentIntents of the given payments concurrently.
+        Returns (payment, payment_intent, error) tuples; exactly one of
+        payment_intent and error is None.
+        """
+        def retrieve(payment):
+            try:
+                return payment, StripeClient.retrieve_payment_intent(
+                    payment.stripe_payment_intent_id
+                ), None
+            except Exception as e:
+                return payment, None, e
+        
+        # The threads only wait on Stripe's API: every database read and
+        # write stays on the main thread and its connection
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(retrieve, payments))
+    
+    @transaction.atomic
+    def _save_status_changes(self, succeeded, failed, other):
+        """Write the collected status changes with a handful of bulk queries."""
+        now = timezone.now()
+        
+        if succeeded:
+            Payment.objects.filter(pk__in=[p.pk for p in succeeded]).update(
+                status='SUCCEEDED', processed_at=now, updated_at=now
+            )
+            # Same transition as Order.confirm(), for every still pending order
+            Order.objects.filter(
+                pk__in=[p.order_id for p in succeeded], status='PENDING'
+            ).update(status='PROCESSING', confirmed_at=now)
+            invalidate_order_statistics()
+        
+        # Failure reasons differ per payment: one CASE-based bulk UPDATE
+        for payment in failed:
+            payment.processed_at = now
+            payment.updated_at = now
+        Payment.objects.bulk_update(
+            failed, ['status', 'failure_reason', 'processed_at', 'updated_at'],
+            batch_size=500
+        )
+        
+        for payment in other:
+            payment.updated_at = now
+        Payment.objects.bulk_update(other, ['status', 'updated_at'], batch_size=500)
+        
+        if succeeded or failed or other:
+            invalidate_payment_stats()
+    
+    def _list_payment_intents(self, cutoff_date):
+        """Index the PaymentIntents created since the cutoff by their id."""
+        try:
+            listing = StripeClient.list_payment_intents(cutoff_date)
+            return {pi.id: pi for pi in listing.auto_paging_iter()}
+        except stripe.error.StripeError as e:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Could not list PaymentIntents ({e}), retrieving them one by one"
+                )
+            )
+            return {}
+    
     def _map_stripe_status(self, stripe_status):
         """Map Stripe payment intent status to our payment status."""
-        status_map = {
-            'requires_payment_method': 'PENDING',
-            'requires_confirmation': 'PENDING',
-            'requires_action': 'PENDING',
-            'processing': 'PROCESSING',
-            'requires_capture': 'PROCESSING',
-            'canceled': 'CANCELLED',
-            'succeeded': 'SUCCEEDED',
-        }
-        return status_map.get(stripe_status, 'PENDING')
+        return _STRIPE_STATUS_MAP.get(stripe_status, 'PENDING')
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0001_initial"),
+    ]
+
+    operations = [
+        # Suppression des raisons en double (choix uniquement, pas de changement SQL)
+        migrations.AlterField(
+            model_name="refund",
+            name="reason",
+            field=models.CharField(
+                choices=[
+                    ("REQUESTED_BY_CUSTOMER", "Demandé par le client"),
+                    ("DUPLICATE", "Paiement en double"),
+                    ("FRAUDULENT", "Frauduleux"),
+                    ("SUBSCRIPTION_CANCELED", "Abonnement annulé"),
+                    ("PRODUCT_UNACCEPTABLE", "Produit non acceptable"),
+                    ("PRODUCT_NOT_RECEIVED", "Produit non reçu"),
+                    ("UNRECOGNIZED", "Non reconnu"),
+                    ("CREDIT_NOT_PROCESSED", "Crédit non traité"),
+                    ("GENERAL", "Raison générale"),
+                    ("INCORRECT_ACCOUNT_DETAILS", "Détails de compte incorrects"),
+                    ("INSUFFICIENT_FUNDS", "Fonds insuffisants"),
+                ],
+                default="REQUESTED_BY_CUSTOMER",
+                help_text="Raison du remboursement",
+                max_length=50,
+                verbose_name="Raison",
+            ),
+        ),
+    ]
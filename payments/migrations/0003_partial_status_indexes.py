@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0002_refund_reason_choices"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                condition=models.Q(status__in=["PENDING", "PROCESSING"]),
+                fields=["created_at"],
+                name="pay_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="refund",
+            index=models.Index(
+                condition=models.Q(status="SUCCEEDED"),
+                fields=["payment"],
+                name="refund_succ_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0003_partial_status_indexes"),
+    ]
+
+    # Les identifiants Stripe sont unique=True : la contrainte UNIQUE a
+    # déjà son propre index, ces index simples ne faisaient que le doubler
+    operations = [
+        migrations.RemoveIndex(
+            model_name="payment",
+            name="payments_pa_stripe__6fe52c_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="refund",
+            name="payments_re_stripe__bc040b_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="webhookevent",
+            name="payments_we_stripe__a54e78_idx",
+        ),
+    ]
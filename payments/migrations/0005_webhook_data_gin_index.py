@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def create_webhook_data_gin_index(apps, schema_editor):
+    """Index GIN jsonb_path_ops pour les recherches data @> '{...}' (PostgreSQL uniquement)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS webhook_data_path_gin '
+        'ON payments_webhookevent USING gin (data jsonb_path_ops)'
+    )
+
+
+def drop_webhook_data_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS webhook_data_path_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0004_remove_redundant_stripe_id_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_webhook_data_gin_index,
+            drop_webhook_data_gin_index,
+        ),
+    ]
@@ -2,14 +2,37 @@
 Models for payment processing with Stripe integration.
 """
 import uuid
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.core.validators import MinValueValidator
 from django.conf import settings
 from django.utils import timezone
 from orders.models import Order
 
 
-class Payment(models.Model):
+class StatusUpdateMixin:
+    """
+    Transitions de statut écrites par un seul UPDATE : pas de save(), donc ni
+    pre_save/post_save ni réécriture des autres colonnes.
+    """
+    
+    def _update(self, processed=False, **fields):
+        """
+        Écrit les champs en base puis sur l'instance. updated_at est toujours
+        horodaté, processed_at aussi (au même instant) si processed est vrai.
+        """
+        now = timezone.now()
+        fields['updated_at'] = now
+        if processed:
+            fields.setdefault('processed_at', now)
+        type(self).objects.filter(pk=self.pk).update(**fields)
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+
+class Payment(StatusUpdateMixin, models.Model):
     """
     Payment record for orders processed through Stripe.
     """
@@ -25,6 +48,9 @@ class Payment(models.Model):
         ('PARTIALLY_REFUNDED', 'Partiellement remboursé'),
     ]
     
+    # Statuts pour lesquels le paiement est encore en attente
+    PENDING_STATUSES = frozenset({'PENDING', 'PROCESSING'})
+    
     # Payment method choices
     PAYMENT_METHOD_CHOICES = [
         ('CARD', 'Carte bancaire'),
@@ -146,15 +172,38 @@ class Payment(models.Model):
         verbose_name_plural = 'Paiements'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['stripe_payment_intent_id']),
             models.Index(fields=['status']),
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['created_at']),
+            # Index partiel : seuls les paiements encore à synchroniser avec Stripe
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(status__in=['PENDING', 'PROCESSING']),
+                name='pay_pending_idx'
+            ),
         ]
     
     def __str__(self):
         return f"Paiement {self.amount}€ - Commande {self.order.order_number}"
     
+    @classmethod
+    def from_stripe_intent(cls, intent, order, user):
+        """
+        Construit (sans l'enregistrer) le paiement d'une commande à partir de
+        son PaymentIntent Stripe. Tous les champs sont fournis, y compris les
+        métadonnées de l'intent : le default=dict n'est jamais appelé.
+        """
+        return cls(
+            order=order,
+            user=user,
+            stripe_payment_intent_id=intent['id'],
+            stripe_client_secret=intent['client_secret'],
+            amount=order.total_amount,
+            currency=intent['currency'].upper(),
+            status='PENDING',
+            metadata=intent.get('metadata') or {},
+        )
+    
     @property
     def is_successful(self):
         """Vérifie si le paiement a réussi."""
@@ -163,28 +212,25 @@ class Payment(models.Model):
     @property
     def is_pending(self):
         """Vérifie si le paiement est en attente."""
-        return self.status in ['PENDING', 'PROCESSING']
+        return self.status in self.PENDING_STATUSES
     
     @property
     def can_be_refunded(self):
         """Vérifie si le paiement peut être remboursé."""
-        return self.status == 'SUCCEEDED'
+        return self.is_successful
     
     def mark_as_succeeded(self):
         """Marque le paiement comme réussi."""
-        self.status = 'SUCCEEDED'
-        self.processed_at = timezone.now()
-        self.save(update_fields=['status', 'processed_at'])
+        self._update(status='SUCCEEDED', processed=True)
+        invalidate_payment_stats()
     
     def mark_as_failed(self, reason=''):
         """Marque le paiement comme échoué."""
-        self.status = 'FAILED'
-        self.failure_reason = reason
-        self.processed_at = timezone.now()
-        self.save(update_fields=['status', 'failure_reason', 'processed_at'])
+        self._update(status='FAILED', failure_reason=reason, processed=True)
+        invalidate_payment_stats()
 
 
-class Refund(models.Model):
+class Refund(StatusUpdateMixin, models.Model):
     """
     Refund record for payments.
     """
@@ -210,12 +256,11 @@ class Refund(models.Model):
         ('GENERAL', 'Raison générale'),
         ('INCORRECT_ACCOUNT_DETAILS', 'Détails de compte incorrects'),
         ('INSUFFICIENT_FUNDS', 'Fonds insuffisants'),
-        ('PRODUCT_NOT_RECEIVED', 'Produit non reçu'),
-        ('PRODUCT_UNACCEPTABLE', 'Produit non acceptable'),
-        ('SUBSCRIPTION_CANCELED', 'Abonnement annulé'),
-        ('UNRECOGNIZED', 'Non reconnu'),
     ]
     
+    # Raisons acceptées telles quelles (en minuscules) par l'API Refund de Stripe
+    STRIPE_REASONS = frozenset({'DUPLICATE', 'FRAUDULENT', 'REQUESTED_BY_CUSTOMER'})
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     
     # Relations
@@ -301,9 +346,14 @@ class Refund(models.Model):
         verbose_name_plural = 'Remboursements'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['stripe_refund_id']),
             models.Index(fields=['payment', '-created_at']),
             models.Index(fields=['status']),
+            # Index partiel : somme des remboursements réussis d'un paiement
+            models.Index(
+                fields=['payment'],
+                condition=models.Q(status='SUCCEEDED'),
+                name='refund_succ_idx'
+            ),
         ]
     
     def __str__(self):
@@ -316,19 +366,16 @@ class Refund(models.Model):
     
     def mark_as_succeeded(self):
         """Marque le remboursement comme réussi."""
-        self.status = 'SUCCEEDED'
-        self.processed_at = timezone.now()
-        self.save(update_fields=['status', 'processed_at'])
+        self._update(status='SUCCEEDED', processed=True)
+        invalidate_payment_stats()
     
     def mark_as_failed(self, reason=''):
         """Marque le remboursement comme échoué."""
-        self.status = 'FAILED'
-        self.failure_reason = reason
-        self.processed_at = timezone.now()
-        self.save(update_fields=['status', 'failure_reason', 'processed_at'])
+        self._update(status='FAILED', failure_reason=reason, processed=True)
+        invalidate_payment_stats()
 
 
-class WebhookEvent(models.Model):
+class WebhookEvent(StatusUpdateMixin, models.Model):
     """
     Record of Stripe webhook events for audit and debugging.
     """
@@ -394,7 +441,6 @@ class WebhookEvent(models.Model):
         verbose_name_plural = 'Événements Webhook'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['stripe_event_id']),
             models.Index(fields=['event_type']),
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
@@ -405,13 +451,27 @@ class WebhookEvent(models.Model):
     
     def mark_as_processed(self):
         """Marque l'événement comme traité."""
-        self.status = 'PROCESSED'
-        self.processed_at = timezone.now()
-        self.save(update_fields=['status', 'processed_at'])
+        self._update(status='PROCESSED', processed=True)
     
     def mark_as_failed(self, error_message=''):
         """Marque l'événement comme échoué."""
-        self.status = 'FAILED'
-        self.error_message = error_message
-        self.processed_at = timezone.now()
-        self.save(update_fields=['status', 'error_message', 'processed_at'])
+        self._update(status='FAILED', error_message=error_message, processed=True)
+
+
+# Statistiques globales des paiements mises en cache par PaymentViewSet.stats
+PAYMENT_STATS_CACHE_KEY = 'payment_stats:v1:global'
+
+
+def invalidate_payment_stats():
+    """
+    Invalide les statistiques de paiements en cache, après commit de la transaction.
+    À appeler après toute écriture qui contourne save() (update(), bulk_update()).
+    """
+    transaction.on_commit(lambda: cache.delete(PAYMENT_STATS_CACHE_KEY))
+
+
+@receiver([post_save, post_delete], sender=Payment)
+@receiver([post_save, post_delete], sender=Refund)
+def payment_changed(sender, instance, **kwargs):
+    """Signal invalidant les statistiques à chaque écriture d'un paiement ou d'un remboursement."""
+    invalidate_payment_stats()
@@ -1,24 +1,111 @@
 """
 Serializers for payments app.
 """
+import copy
+from operator import attrgetter
+
 from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
 from decimal import Decimal
+from django.db.models import Sum
+from django.db.models.manager import BaseManager
+from drf_spectacular.utils import extend_schema_field
 from .models import Payment, Refund, WebhookEvent
 from orders.models import Order
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class CachedFieldsMixin:
+    """
+    Build a ModelSerializer's fields once per class; each instance gets a
+    deep copy of that template instead of re-running the model introspection.
+    """
+    
+    def get_fields(self):
+        cls = type(self)
+        template = cls.__dict__.get('_fields_template')
+        if template is None:
+            template = super().get_fields()
+            cls._fields_template = template
+        return copy.deepcopy(template)
+
+
+@extend_schema_field(serializers.CharField)
+class FormattedAmountField(serializers.Field):
+    """
+    "<amount> <currency>", read from the formatted_amount annotation the
+    viewsets add in SQL; built in Python for non-annotated instances.
+    """
+    
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, obj):
+        formatted = getattr(obj, 'formatted_amount', None)
+        if formatted is None:
+            formatted = f"{obj.amount} {obj.currency}"
+        return formatted
+
+
+class PaymentListSerializer(serializers.ListSerializer):
+    """
+    List serializer resolving each child field once per page. Plain model
+    columns and FK ids are read with an attrgetter; every other field goes
+    through DRF's own get_attribute (callables, nested sources, SkipField).
+    """
+    
+    def _columns(self):
+        model = self.child.Meta.model
+        plain = {f.attname for f in model._meta.concrete_fields if not f.is_relation}
+        columns = []
+        for field in self.child._readable_fields:
+            if (isinstance(field, serializers.PrimaryKeyRelatedField)
+                    and field.pk_field is None and len(field.source_attrs) == 1):
+                # FK column read directly, as DRF's pk-only optimization does
+                columns.append((field, attrgetter(f'{field.source}_id'), None))
+            elif field.source in plain:
+                columns.append((field, attrgetter(field.source), field.to_representation))
+            else:
+                columns.append((field, None, None))
+        return columns
+    
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        columns = self._columns()
+        rows = []
+        for obj in iterable:
+            row = {}
+            for field, getter, convert in columns:
+                if getter is None:
+                    # Generic DRF path, as in Serializer.to_representation
+                    try:
+                        value = field.get_attribute(obj)
+                    except SkipField:
+                        continue
+                    check = value.pk if isinstance(value, PKOnlyObject) else value
+                    row[field.field_name] = None if check is None else field.to_representation(value)
+                else:
+                    value = getter(obj)
+                    row[field.field_name] = value if value is None or convert is None else convert(value)
+            rows.append(row)
+        return rows
+
+
+class PaymentSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for Payment model."""
     
     order_number = serializers.CharField(source='order.order_number', read_only=True)
     user_email = serializers.CharField(source='user.email', read_only=True)
-    formatted_amount = serializers.SerializerMethodField()
+    formatted_amount = FormattedAmountField()
     is_successful = serializers.BooleanField(read_only=True)
     is_pending = serializers.BooleanField(read_only=True)
     can_be_refunded = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = Payment
+        list_serializer_class = PaymentListSerializer
         fields = [
             'id', 'order', 'order_number', 'user', 'user_email',
             'stripe_payment_intent_id', 'amount', 'formatted_amount',
@@ -30,10 +117,6 @@ class PaymentSerializer(serializers.ModelSerializer):
             'id', 'stripe_payment_intent_id', 'stripe_fee', 'net_amount',
             'created_at', 'updated_at', 'processed_at', 'failure_reason'
         ]
-    
-    def get_formatted_amount(self, obj):
-        """Return formatted amount with currency."""
-        return f"{obj.amount} {obj.currency}"
 
 
 class PaymentCreateSerializer(serializers.Serializer):
@@ -49,12 +132,12 @@ class PaymentCreateSerializer(serializers.Serializer):
             raise serializers.ValidationError("Authentication required")
         
         try:
-            order = Order.objects.get(id=value, consumer=request.user)
+            order = Order.objects.only('id', 'status').get(id=value, consumer=request.user)
         except Order.DoesNotExist:
             raise serializers.ValidationError("Order not found or access denied")
         
-        # Check if order already has a payment
-        if hasattr(order, 'payment'):
+        # Check if order already has a payment (SELECT 1 on the unique order_id index)
+        if Payment.objects.filter(order_id=order.pk).exists():
             raise serializers.ValidationError("Order already has a payment")
         
         # Check if order can be paid
@@ -74,12 +157,12 @@ class PaymentIntentResponseSerializer(serializers.Serializer):
     currency = serializers.CharField()
 
 
-class RefundSerializer(serializers.ModelSerializer):
+class RefundSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for Refund model."""
     
     payment_id = serializers.CharField(source='payment.id', read_only=True)
     order_number = serializers.CharField(source='payment.order.order_number', read_only=True)
-    formatted_amount = serializers.SerializerMethodField()
+    formatted_amount = FormattedAmountField()
     is_successful = serializers.BooleanField(read_only=True)
     
     class Meta:
@@ -95,10 +178,6 @@ class RefundSerializer(serializers.ModelSerializer):
             'id', 'stripe_refund_id', 'created_at', 'updated_at',
             'processed_at', 'failure_reason'
         ]
-    
-    def get_formatted_amount(self, obj):
-        """Return formatted amount with currency."""
-        return f"{obj.amount} {obj.currency}"
 
 
 class RefundCreateSerializer(serializers.Serializer):
@@ -140,6 +219,8 @@ class RefundCreateSerializer(serializers.Serializer):
         if not payment.can_be_refunded:
             raise serializers.ValidationError("Payment cannot be refunded")
         
+        # Reused by validate(): no second fetch of the same row
+        self._payment = payment
         return value
     
     def validate_amount(self, value):
@@ -150,32 +231,25 @@ class RefundCreateSerializer(serializers.Serializer):
     
     def validate(self, attrs):
         """Cross-field validation."""
-        payment_id = attrs.get('payment_id')
         amount = attrs.get('amount')
+        # Set by validate_payment_id once the payment passed its checks
+        payment = getattr(self, '_payment', None)
         
-        if payment_id and amount:
-            try:
-                payment = Payment.objects.get(id=payment_id)
-                
-                # Check if refund amount doesn't exceed payment amount
-                total_refunded = sum(
-                    refund.amount for refund in payment.refunds.filter(
-                        status='SUCCEEDED'
-                    )
-                )
-                
-                if total_refunded + amount > payment.amount:
-                    raise serializers.ValidationError({
-                        'amount': 'Refund amount exceeds available amount'
-                    })
-                    
-            except Payment.DoesNotExist:
-                pass  # Will be caught by payment_id validation
+        if payment is not None and amount:
+            # Check if refund amount doesn't exceed payment amount
+            total_refunded = payment.refunds.filter(
+                status='SUCCEEDED'
+            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+            
+            if total_refunded + amount > payment.amount:
+                raise serializers.ValidationError({
+                    'amount': 'Refund amount exceeds available amount'
+                })
         
         return attrs
 
 
-class WebhookEventSerializer(serializers.ModelSerializer):
+class WebhookEventSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for WebhookEvent model."""
     
     class Meta:
@@ -1,6 +1,11 @@
 """
 Stripe client configuration and utilities for GreenCart payments.
 """
+import hashlib
+import hmac
+import json
+import time
+
 import stripe
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
@@ -16,6 +21,47 @@ if not settings.STRIPE_SECRET_KEY:
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+# Webhook secret encoded once for the per-request HMAC
+_WEBHOOK_SECRET_BYTES = settings.STRIPE_WEBHOOK_SECRET.encode('utf-8')
+
+# Maximum age (seconds) of a signed webhook, as in the Stripe SDK
+WEBHOOK_TOLERANCE = 300
+
+
+def _verify_webhook_signature(payload, signature, secret):
+    """
+    Check a Stripe-Signature header (t=...,v1=...) against the raw payload.
+    
+    Raises stripe.error.SignatureVerificationError like the Stripe SDK.
+    """
+    timestamp = None
+    candidates = []
+    for item in signature.split(','):
+        key, _, value = item.partition('=')
+        key = key.strip()
+        if key == 't':
+            timestamp = value.strip()
+        elif key == 'v1':
+            candidates.append(value.strip())
+    
+    if not timestamp or not timestamp.isdigit() or not candidates:
+        raise stripe.error.SignatureVerificationError(
+            "Unable to extract timestamp and signatures from header", signature, payload
+        )
+    
+    expected = hmac.new(
+        secret, timestamp.encode('ascii') + b'.' + payload, hashlib.sha256
+    ).hexdigest()
+    if not any(hmac.compare_digest(expected, candidate) for candidate in candidates):
+        raise stripe.error.SignatureVerificationError(
+            "No signatures found matching the expected signature for payload", signature, payload
+        )
+    
+    if int(timestamp) < time.time() - WEBHOOK_TOLERANCE:
+        raise stripe.error.SignatureVerificationError(
+            "Timestamp outside the tolerance zone", signature, payload
+        )
+
 
 class StripeClient:
     """
@@ -69,6 +115,29 @@ class StripeClient:
             logger.error(f"Stripe error retrieving PaymentIntent {payment_intent_id}: {e}")
             raise
     
+    @staticmethod
+    def list_payment_intents(created_after, limit=100):
+        """
+        List Stripe PaymentIntents created since a given date.
+        
+        Args:
+            created_after (datetime): Lower bound on the PaymentIntent creation date
+            limit (int): Page size, up to 100 (default: 100)
+            
+        Returns:
+            stripe.ListObject: First page; use auto_paging_iter() to walk all pages
+        """
+        try:
+            payment_intents = stripe.PaymentIntent.list(
+                created={'gte': int(created_after.timestamp())},
+                limit=limit
+            )
+            logger.info(f"Listed PaymentIntents created since {created_after.isoformat()}")
+            return payment_intents
+        except stripe.error.StripeError as e:
+            logger.error(f"Stripe error listing PaymentIntents: {e}")
+            raise
+    
     @staticmethod
     def confirm_payment_intent(payment_intent_id, payment_method=None):
         """
@@ -187,10 +256,16 @@ class StripeClient:
                 "STRIPE_WEBHOOK_SECRET must be set to verify webhooks"
             )
         
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        if webhook_secret == settings.STRIPE_WEBHOOK_SECRET:
+            secret = _WEBHOOK_SECRET_BYTES
+        else:
+            secret = webhook_secret.encode('utf-8')
+        
         try:
-            event = stripe.Webhook.construct_event(
-                payload, signature, webhook_secret
-            )
+            _verify_webhook_signature(payload, signature, secret)
+            event = stripe.Event.construct_from(json.loads(payload), stripe.api_key)
             logger.info(f"Constructed webhook event: {event['type']} - {event['id']}")
             return event
         except ValueError as e:
@@ -0,0 +1,20 @@
+"""
+Background tasks for payments app (Celery, optional).
+"""
+try:
+    from celery import shared_task
+except ImportError:
+    shared_task = None
+
+from .models import WebhookEvent
+from .webhooks import process_webhook_event
+
+
+def process_stripe_event(webhook_event_id):
+    """Process a stored Stripe webhook event outside of the request."""
+    webhook_event = WebhookEvent.objects.get(pk=webhook_event_id)
+    return process_webhook_event(webhook_event)
+
+
+if shared_task is not None:
+    process_stripe_event = shared_task(process_stripe_event)
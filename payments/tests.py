@@ -0,0 +1,250 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.test import APITestCase
+
+from orders.models import Order
+from .models import Payment, Refund, WebhookEvent
+from .serializers import PaymentSerializer, RefundSerializer
+from .webhooks import WEBHOOK_CLAIM_TIMEOUT, WEBHOOK_SEEN_TIMEOUT, _seen_key
+
+User = get_user_model()
+
+
+class PaymentTestMixin:
+    """Données communes : un client, ses commandes payées et un remboursement par paiement."""
+
+    def create_payments(self, count):
+        """Créer `count` commandes payées (25.00 EUR) remboursées de 5.50 EUR."""
+        payments = []
+        for i in range(count):
+            order = Order.objects.create(
+                consumer=self.consumer,
+                delivery_address='2 rue de la Gare',
+                delivery_city='Lyon',
+                delivery_postal_code='69002',
+                total_amount=Decimal('25.00')
+            )
+            payment = Payment.objects.create(
+                order=order,
+                user=self.consumer,
+                stripe_payment_intent_id=f'pi_test_{self.id()}_{i}',
+                amount=Decimal('25.00'),
+                currency='EUR',
+                status='SUCCEEDED'
+            )
+            Refund.objects.create(
+                payment=payment,
+                stripe_refund_id=f're_test_{self.id()}_{i}',
+                amount=Decimal('5.50'),
+                currency='EUR',
+                status='SUCCEEDED'
+            )
+            payments.append(payment)
+        return payments
+
+    def setUp(self):
+        """Créer le client authentifié."""
+        self.consumer = User.objects.create_user(
+            username='client',
+            email='client@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.consumer)
+
+
+class FormattedAmountTest(PaymentTestMixin, APITestCase):
+    """Le montant formaté est identique qu'il vienne de la base ou de Python."""
+
+    def setUp(self):
+        super().setUp()
+        self.payment = self.create_payments(1)[0]
+        self.refund = self.payment.refunds.get()
+
+    def test_payment_list_formatted_amount(self):
+        """Liste des paiements : montant à deux décimales construit en SQL."""
+        response = self.client.get(reverse('api:payments:payment-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['formatted_amount'], '25.00 EUR')
+
+    def test_refund_retrieve_formatted_amount(self):
+        """Détail d'un remboursement : 5.50 et non 5.5."""
+        response = self.client.get(
+            reverse('api:payments:refund-detail', kwargs={'pk': self.refund.pk})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['formatted_amount'], '5.50 EUR')
+
+    def test_formatted_amount_without_annotation(self):
+        """Instances non annotées (réponses de création) : même format."""
+        payment = Payment.objects.get(pk=self.payment.pk)
+        refund = Refund.objects.get(pk=self.refund.pk)
+
+        self.assertEqual(PaymentSerializer(payment).data['formatted_amount'], '25.00 EUR')
+        self.assertEqual(RefundSerializer(refund).data['formatted_amount'], '5.50 EUR')
+
+
+class StatusUpdateTest(PaymentTestMixin, APITestCase):
+    """Transitions de statut écrites par un seul UPDATE."""
+
+    def setUp(self):
+        super().setUp()
+        self.payment = self.create_payments(1)[0]
+
+    def test_mark_as_failed_updates_row_and_instance(self):
+        """Statut, raison et horodatages écrits en base et sur l'instance."""
+        with self.assertNumQueries(1):
+            self.payment.mark_as_failed('card_declined')
+
+        stored = Payment.objects.get(pk=self.payment.pk)
+        self.assertEqual(stored.status, 'FAILED')
+        self.assertEqual(stored.failure_reason, 'card_declined')
+        self.assertEqual(stored.processed_at, self.payment.processed_at)
+        self.assertEqual(stored.updated_at, stored.processed_at)
+
+    def test_update_without_processed_at(self):
+        """Une transition non finale ne touche qu'updated_at."""
+        self.payment._update(status='PROCESSING')
+
+        stored = Payment.objects.get(pk=self.payment.pk)
+        self.assertEqual(stored.status, 'PROCESSING')
+        self.assertIsNone(stored.processed_at)
+        self.assertEqual(stored.updated_at, self.payment.updated_at)
+
+
+class PaymentQueryCountTest(PaymentTestMixin, APITestCase):
+    """Un seul SELECT par endpoint, quel que soit le nombre de paiements."""
+
+    def setUp(self):
+        super().setUp()
+        self.payments = self.create_payments(4)
+
+    def test_payment_list_query_count(self):
+        """Liste : commande et utilisateur joints, montant formaté en SQL."""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('api:payments:payment-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 4)
+
+    def test_payment_retrieve_query_count(self):
+        """Détail d'un paiement."""
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('api:payments:payment-detail', kwargs={'pk': self.payments[0].pk})
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['order_number'], self.payments[0].order.order_number)
+
+    def test_refund_list_query_count(self):
+        """Liste des remboursements : paiement et commande joints."""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('api:payments:refund-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 4)
+
+    def test_refund_retrieve_query_count(self):
+        """Détail d'un remboursement."""
+        refund = self.payments[0].refunds.get()
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('api:payments:refund-detail', kwargs={'pk': refund.pk})
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['order_number'], self.payments[0].order.order_number)
+
+
+class WebhookClaimTest(APITestCase):
+    """Réservation en cache des événements Stripe reçus."""
+
+    event = {
+        'id': 'evt_test_claim',
+        'type': 'customer.created',
+        'data': {'object': {'id': 'cus_test'}},
+    }
+
+    def setUp(self):
+        cache.delete(_seen_key(self.event['id']))
+        patcher = mock.patch(
+            'payments.webhooks.StripeClient.construct_webhook_event',
+            return_value=self.event
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def deliver(self):
+        return self.client.post(
+            reverse('api:payments:stripe-webhook'), b'{}',
+            content_type='application/json', HTTP_STRIPE_SIGNATURE='t=1,v1=test'
+        )
+
+    def test_claim_is_short_then_extended_once_processed(self):
+        """Réservation courte pendant le traitement, prolongée une fois l'événement traité."""
+        with mock.patch.object(cache, 'add', wraps=cache.add) as add, \
+                mock.patch.object(cache, 'set', wraps=cache.set) as set_:
+            response = self.deliver()
+
+        self.assertEqual(response.data, {'status': 'success'})
+        add.assert_called_once_with(_seen_key(self.event['id']), 1, WEBHOOK_CLAIM_TIMEOUT)
+        set_.assert_called_once_with(_seen_key(self.event['id']), 1, WEBHOOK_SEEN_TIMEOUT)
+        self.assertEqual(self.deliver().data, {'status': 'duplicate'})
+
+    def test_expired_claim_reprocesses_received_event(self):
+        """Un événement resté RECEIVED (worker tué) est traité au prochain envoi de Stripe."""
+        WebhookEvent.objects.create(
+            stripe_event_id=self.event['id'],
+            event_type=self.event['type'],
+            data=self.event,
+            status='RECEIVED'
+        )
+
+        response = self.deliver()
+
+        self.assertEqual(response.data, {'status': 'success'})
+        self.assertEqual(
+            WebhookEvent.objects.get(stripe_event_id=self.event['id']).status, 'PROCESSED'
+        )
+
+
+class PaymentListSerializerTest(PaymentTestMixin, APITestCase):
+    """Le chemin rapide de la liste rend exactement ce que rend PaymentSerializer."""
+
+    def setUp(self):
+        super().setUp()
+        self.create_payments(3)
+
+    def test_list_rows_match_single_serializer(self):
+        """Chaque ligne de la liste est identique à la sérialisation unitaire."""
+        response = self.client.get(reverse('api:payments:payment-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for row in response.data:
+            payment = Payment.objects.select_related('order', 'user').get(pk=row['id'])
+            self.assertEqual(row, PaymentSerializer(payment).data)
+
+    def test_callable_source_goes_through_get_attribute(self):
+        """Un champ à source appelable (get_status_display) est rendu comme par DRF."""
+
+        class LabelledPaymentSerializer(PaymentSerializer):
+            status_label = serializers.CharField(source='get_status_display', read_only=True)
+
+            class Meta(PaymentSerializer.Meta):
+                fields = PaymentSerializer.Meta.fields + ['status_label']
+
+        payments = list(Payment.objects.select_related('order', 'user'))
+        rows = LabelledPaymentSerializer(payments, many=True).data
+
+        self.assertEqual(rows[0]['status_label'], 'Réussi')
+        self.assertEqual(
+            [dict(row) for row in rows],
+            [dict(LabelledPaymentSerializer(payment).data) for payment in payments]
+        )
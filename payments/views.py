@@ -7,15 +7,17 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Sum, Count
+from django.db.models import CharField, Q, Sum, Count, Value
+from django.db.models.functions import Cast, Concat
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.openapi import OpenApiTypes
 import stripe
 import logging
 
-from .models import Payment, Refund, WebhookEvent
+from .models import PAYMENT_STATS_CACHE_KEY, Payment, Refund, WebhookEvent
 from .serializers import (
     PaymentSerializer, PaymentCreateSerializer, PaymentIntentResponseSerializer,
     RefundSerializer, RefundCreateSerializer, WebhookEventSerializer,
@@ -26,6 +28,26 @@ from orders.models import Order
 
 logger = logging.getLogger(__name__)
 
+# Seconds the payment statistics stay cached
+PAYMENT_STATS_CACHE_TIMEOUT = 60
+
+class AmountText(Cast):
+    """Amount as text with exactly two decimals, like str() of the Decimal field."""
+    
+    def __init__(self, expression):
+        super().__init__(expression, CharField())
+    
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # SQLite stores the amount as a REAL: CAST would print 25 or 5.5
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"printf('%%.2f', {sql})", params
+
+
+# "<amount> <currency>" built by the database for FormattedAmountField
+FORMATTED_AMOUNT = Concat(
+    AmountText('amount'), Value(' '), 'currency', output_field=CharField()
+)
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -66,12 +88,25 @@ class PaymentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter queryset based on user permissions."""
         user = self.request.user
+        # order_number and user_email are read through these FKs: one JOIN
+        queryset = Payment.objects.select_related('order', 'user').annotate(
+            formatted_amount=FORMATTED_AMOUNT
+        )
+        if self.action in ('list', 'retrieve'):
+            # Rendered columns only: no client secret, no metadata JSON,
+            # and a single column from the wide order and user rows
+            queryset = queryset.only(
+                'id', 'stripe_payment_intent_id', 'amount', 'currency', 'status',
+                'payment_method', 'stripe_fee', 'net_amount', 'created_at',
+                'updated_at', 'processed_at', 'failure_reason',
+                'order__order_number', 'user__email'
+            )
         
         if user.is_staff or user.is_superuser:
-            return Payment.objects.all()
+            return queryset
         else:
             # Regular users can only see their own payments
-            return Payment.objects.filter(user=user)
+            return queryset.filter(user=user)
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -107,15 +142,8 @@ class PaymentViewSet(viewsets.ModelViewSet):
             )
             
             # Create payment record
-            payment = Payment.objects.create(
-                order=order,
-                user=request.user,
-                stripe_payment_intent_id=payment_intent.id,
-                stripe_client_secret=payment_intent.client_secret,
-                amount=order.total_amount,
-                currency=settings.STRIPE_CURRENCY,
-                status='PENDING'
-            )
+            payment = Payment.from_stripe_intent(payment_intent, order, request.user)
+            payment.save(force_insert=True)
             
             # Return response for frontend
             response_data = {
@@ -251,36 +279,36 @@ class PaymentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Calculate stats
-        total_payments = Payment.objects.count()
-        successful_payments = Payment.objects.filter(status='SUCCEEDED').count()
-        failed_payments = Payment.objects.filter(status='FAILED').count()
-        pending_payments = Payment.objects.filter(status__in=['PENDING', 'PROCESSING']).count()
-        
-        total_amount = Payment.objects.filter(status='SUCCEEDED').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        total_refunded = Refund.objects.filter(status='SUCCEEDED').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        success_rate = (successful_payments / total_payments * 100) if total_payments > 0 else 0
-        
-        stats_data = {
-            'total_payments': total_payments,
-            'successful_payments': successful_payments,
-            'failed_payments': failed_payments,
-            'pending_payments': pending_payments,
-            'total_amount': total_amount,
-            'total_refunded': total_refunded,
-            'success_rate': round(success_rate, 2)
-        }
-        
+        # Cached until the next payment/refund write (or the timeout)
+        stats_data = cache.get_or_set(
+            PAYMENT_STATS_CACHE_KEY, _payment_stats, PAYMENT_STATS_CACHE_TIMEOUT
+        )
         serializer = PaymentStatsSerializer(stats_data)
         return Response(serializer.data)
 
 
+def _payment_stats():
+    """Compute the payment statistics: one payment aggregate, one refund aggregate."""
+    stats_data = Payment.objects.aggregate(
+        total_payments=Count('id'),
+        successful_payments=Count('id', filter=Q(status='SUCCEEDED')),
+        failed_payments=Count('id', filter=Q(status='FAILED')),
+        pending_payments=Count('id', filter=Q(status__in=['PENDING', 'PROCESSING'])),
+        total_amount=Sum('amount', filter=Q(status='SUCCEEDED')),
+    )
+    stats_data['total_amount'] = stats_data['total_amount'] or 0
+    stats_data['total_refunded'] = Refund.objects.filter(status='SUCCEEDED').aggregate(
+        total=Sum('amount')
+    )['total'] or 0
+    
+    total_payments = stats_data['total_payments']
+    success_rate = (
+        stats_data['successful_payments'] / total_payments * 100
+    ) if total_payments > 0 else 0
+    stats_data['success_rate'] = round(success_rate, 2)
+    return stats_data
+
+
 @extend_schema_view(
     list=extend_schema(
         tags=['Payments'],
@@ -315,12 +343,24 @@ class RefundViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter queryset based on user permissions."""
         user = self.request.user
+        # order_number is read through payment.order: one JOIN
+        queryset = Refund.objects.select_related('payment__order').annotate(
+            formatted_amount=FORMATTED_AMOUNT
+        )
+        if self.action in ('list', 'retrieve'):
+            # Rendered columns only: no metadata JSON, nothing from the
+            # payment and order rows but the order number
+            queryset = queryset.only(
+                'id', 'stripe_refund_id', 'amount', 'currency', 'status',
+                'reason', 'description', 'created_at', 'updated_at',
+                'processed_at', 'failure_reason', 'payment__order__order_number'
+            )
         
         if user.is_staff or user.is_superuser:
-            return Refund.objects.all()
+            return queryset
         else:
             # Regular users can only see refunds for their payments
-            return Refund.objects.filter(payment__user=user)
+            return queryset.filter(payment__user=user)
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -352,7 +392,7 @@ class RefundViewSet(viewsets.ModelViewSet):
             stripe_refund = StripeClient.create_refund(
                 payment_intent_id=payment.stripe_payment_intent_id,
                 amount=stripe_amount,
-                reason=reason.lower() if reason in ['duplicate', 'fraudulent', 'requested_by_customer'] else None,
+                reason=reason.lower() if reason in Refund.STRIPE_REASONS else None,
                 metadata={
                     'payment_id': str(payment.id),
                     'order_id': str(payment.order.id),
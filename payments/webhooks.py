@@ -8,6 +8,8 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.utils.decorators import method_decorator
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
@@ -18,9 +20,18 @@ import stripe
 from .models import Payment, Refund, WebhookEvent
 from .stripe_client import StripeClient, convert_from_stripe_amount
 from orders.models import Order
+from core import celery_app
 
 logger = logging.getLogger(__name__)
 
+# A delivery claims its event id for one processing attempt only: if the
+# worker dies or the Celery task is lost, Stripe's retry gets through
+WEBHOOK_CLAIM_TIMEOUT = 5 * 60
+
+# Stripe retries deliveries for up to 3 days: processed event ids are
+# remembered for a week
+WEBHOOK_SEEN_TIMEOUT = 7 * 24 * 3600
+
 
 class WebhookHandler:
     """
@@ -78,14 +89,13 @@ class WebhookHandler:
                 if 'payment_method_details' in charge:
                     payment_method_type = charge['payment_method_details']['type']
                     payment.payment_method = payment_method_type.upper()
+                    payment.save(update_fields=['payment_method', 'updated_at'])
                 
                 # Update fees
                 if 'balance_transaction' in charge:
                     # Note: balance_transaction might need to be retrieved separately
                     pass
             
-            payment.save()
-            
             # Update order status
             if payment.order.status == 'PENDING':
                 payment.order.confirm()
@@ -242,6 +252,42 @@ class WebhookHandler:
         return True
 
 
+def _seen_key(event_id):
+    """Cache key claiming a Stripe event id."""
+    return f'stripe:evt:{event_id}'
+
+
+def process_webhook_event(webhook_event):
+    """
+    Run the handler for a stored webhook event and record the outcome.
+    Returns whether the handler succeeded; handler exceptions are re-raised.
+    """
+    event = webhook_event.data
+    try:
+        success = WebhookHandler(event).handle()
+    except Exception as e:
+        webhook_event.mark_as_failed(str(e))
+        cache.delete(_seen_key(event['id']))
+        raise
+    
+    if success:
+        webhook_event.mark_as_processed()
+        # Processed for good: extend the claim so redeliveries skip the database
+        cache.set(_seen_key(event['id']), 1, WEBHOOK_SEEN_TIMEOUT)
+        logger.info(f"Successfully processed webhook: {event['type']} - {event['id']}")
+    else:
+        webhook_event.mark_as_failed('Handler returned False')
+        # Let Stripe's next delivery of this event through the cache check
+        cache.delete(_seen_key(event['id']))
+        logger.error(f"Handler failed for webhook: {event['type']} - {event['id']}")
+    return success
+
+
+def _offload_webhooks():
+    """Whether webhook processing goes to Celery (installed and a broker configured)."""
+    return celery_app is not None and bool(getattr(settings, 'CELERY_BROKER_URL', None))
+
+
 @csrf_exempt
 @require_POST
 @api_view(['POST'])
@@ -266,29 +312,41 @@ def stripe_webhook(request):
             payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
         )
         
-        # Create webhook event record
-        webhook_event = WebhookEvent.objects.create(
+        # Claim the event id in the cache (atomic add): redeliveries of a
+        # claimed event are answered without touching the database
+        seen_key = _seen_key(event['id'])
+        if not cache.add(seen_key, 1, WEBHOOK_CLAIM_TIMEOUT):
+            logger.info(f"Duplicate webhook ignored: {event['type']} - {event['id']}")
+            return Response({'status': 'duplicate'})
+        
+        # Record the event once (the unique constraint remains the safety net)
+        webhook_event, created = WebhookEvent.objects.get_or_create(
             stripe_event_id=event['id'],
-            event_type=event['type'],
-            data=event,
-            status='RECEIVED'
+            defaults={
+                'event_type': event['type'],
+                'data': event,
+                'status': 'RECEIVED',
+            }
         )
+        if not created and webhook_event.status in ('PROCESSED', 'IGNORED'):
+            cache.set(seen_key, 1, WEBHOOK_SEEN_TIMEOUT)
+            logger.info(f"Duplicate webhook ignored: {event['type']} - {event['id']}")
+            return Response({'status': 'duplicate'})
         
-        # Process the event
-        handler = WebhookHandler(event)
-        success = handler.handle()
+        if _offload_webhooks():
+            # Acknowledge now, process on a Celery worker once the row is committed
+            from .tasks import process_stripe_event
+            event_pk = str(webhook_event.pk)
+            transaction.on_commit(lambda: process_stripe_event.delay(event_pk))
+            return Response({'status': 'queued'})
         
-        if success:
-            webhook_event.mark_as_processed()
-            logger.info(f"Successfully processed webhook: {event['type']} - {event['id']}")
+        # Process the event
+        if process_webhook_event(webhook_event):
             return Response({'status': 'success'})
-        else:
-            webhook_event.mark_as_failed('Handler returned False')
-            logger.error(f"Handler failed for webhook: {event['type']} - {event['id']}")
-            return Response(
-                {'error': 'Handler failed'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        return Response(
+            {'error': 'Handler failed'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
     except ValueError as e:
         logger.error(f"Invalid payload in webhook: {e}")
@@ -305,14 +363,11 @@ def stripe_webhook(request):
         )
     
     except Exception as e:
+        # process_webhook_event already marked the event as failed
         logger.error(f"Error processing webhook: {e}")
-        
-        # Try to mark webhook as failed if we have the event
-        try:
-            if 'webhook_event' in locals():
-                webhook_event.mark_as_failed(str(e))
-        except:
-            pass
+        # Release the claim so that Stripe's retry is processed
+        if 'seen_key' in locals():
+            cache.delete(seen_key)
         
         return Response(
             {'error': 'Internal server error'}, 
@@ -2,6 +2,7 @@
 Serializers for products management in GreenCart.
 """
 from rest_framework import serializers
+from django.db.models import Q, Sum
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema_field
 from .models import Category, Product, ProductImage
@@ -151,6 +152,21 @@ class ProductListSerializer(serializers.ModelSerializer):
             'category_name', 'category_icon', 'sales_count', 'total_revenue', 'created_at'
         ]
     
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Rendered columns only, with the sales counters annotated in the same query."""
+        delivered = Q(order_items__order__status='DELIVERED')
+        return queryset.select_related('producer', 'category').only(
+            'id', 'name', 'description', 'price', 'unit', 'quantity_available',
+            'expiry_date', 'rating', 'image_data', 'image_format', 'is_organic',
+            'is_local', 'is_active', 'created_at',
+            'producer__business_name', 'producer__region',
+            'category__name', 'category__icon'
+        ).annotate(
+            sales_count=Sum('order_items__quantity', filter=delivered),
+            total_revenue=Sum('order_items__total_price', filter=delivered),
+        )
+
     @extend_schema_field(serializers.BooleanField)
     def get_is_expiring_soon(self, obj):
         """Check if product expires soon."""
@@ -159,6 +175,8 @@ class ProductListSerializer(serializers.ModelSerializer):
     @extend_schema_field(serializers.IntegerField)
     def get_sales_count(self, obj):
         """Total quantity sold (delivered orders only)."""
+        if hasattr(obj, 'sales_count'):
+            return obj.sales_count or 0
         from django.db.models import Sum
         from orders.models import OrderItem
         aggregate = OrderItem.objects.filter(
@@ -170,6 +188,8 @@ class ProductListSerializer(serializers.ModelSerializer):
     @extend_schema_field(serializers.DecimalField(max_digits=10, decimal_places=2))
     def get_total_revenue(self, obj):
         """Total revenue generated by this product (delivered orders only)."""
+        if hasattr(obj, 'total_revenue'):
+            return obj.total_revenue or 0
         from django.db.models import Sum
         from orders.models import OrderItem
         aggregate = OrderItem.objects.filter(